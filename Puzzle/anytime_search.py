@@ -0,0 +1,189 @@
+import heapq
+import time
+
+from distance_table import table_solution
+from heuristics import make_heuristic
+from move_sequence import MoveSequence
+from packed_state import StateCodec
+from search_stats import SearchStats
+
+
+class AnytimeSolver:
+    """
+    Solveur « anytime » de type ARA* (Anytime Repairing A*).
+    Une première recherche A* pondérée (f = g + w * h, avec w > 1) trouve très vite une
+    solution, au plus w fois plus longue que l'optimale. Le poids est ensuite réduit pas à pas
+    jusqu'à 1 en réutilisant les états déjà explorés : chaque solution améliorée est publiée
+    avec sa borne de sous-optimalité, la dernière (borne 1.0) étant optimale.
+    Sur les grandes grilles (4x5, 5x4...), l'IA répond ainsi toujours en temps interactif.
+    """
+
+    def __init__(self, puzzle_instance, heuristic="manhattan", progress_callback=None, progress_interval=1000,
+                 profile=False, initial_weight=3.0, weight_step=0.5, use_table=True):
+        # Stocke l'instance du puzzle pour accéder à son état et à ses propriétés
+        self.puzzle = puzzle_instance
+        self.gw, self.gh = puzzle_instance.gs
+        self.use_table = use_table  # Table de distances exactes (voir AStarSolver)
+        # Les états sont manipulés sous forme d'entiers compacts (voir packed_state.py)
+        self.codec = StateCodec(self.gw, self.gh)
+        self.heuristic = make_heuristic(heuristic, self.codec)
+        self.initial_weight = initial_weight  # Poids de la première recherche
+        self.weight_step = weight_step  # Diminution du poids entre deux recherches
+        # Compteurs et rappels (voir search_stats.py) ; f_bound est ici le poids courant
+        self.stats = SearchStats(profile)
+        if progress_callback is not None:
+            self.stats.add_hook(progress_callback, progress_interval)
+
+        self.best_path = None  # Meilleure solution trouvée jusqu'ici (MoveSequence)
+        self.bound = float("inf")  # Borne de sous-optimalité de best_path (1.0 = optimale)
+
+    def add_hook(self, callback, every=1000):
+        """Enregistre callback(stats), appelé tous les 'every' nœuds développés."""
+        self.stats.add_hook(callback, every)
+
+    def solve(self, time_budget=None):
+        """
+        Renvoie la meilleure solution trouvée dans le budget de temps (en secondes).
+        Sans budget, la recherche continue jusqu'à la solution optimale. Si aucune solution
+        n'est encore connue quand le budget expire, la recherche se poursuit jusqu'à la première.
+        """
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        for _ in self.solutions(deadline):
+            pass
+        return self.best_path
+
+    def solutions(self, deadline=None):
+        """
+        Générateur ARA* : produit (chemin, borne) à chaque amélioration de la solution.
+        S'arrête une fois l'optimalité prouvée, ou dès que 'deadline' (time.perf_counter())
+        est dépassée et qu'au moins une solution a été trouvée.
+        """
+        self.best_path, self.bound = None, float("inf")
+        if not self.puzzle.is_solvable():
+            return
+
+        codec = self.codec
+        start_node = codec.pack(self.puzzle.state)
+        start_blank = codec.blank_index(start_node)
+        target_node = codec.solved
+        stats = self.stats
+        stats.reset()
+        table_path = table_solution(self.puzzle, stats) if self.use_table else None
+        if table_path is not None:
+            self.best_path, self.bound = table_path, 1.0  # Lue dans la table : optimale d'emblée
+            yield self.best_path, self.bound
+            return
+        if start_node == target_node:
+            self.best_path, self.bound = MoveSequence(self.gw), 1.0
+            yield self.best_path, self.bound
+            return
+        heuristic = stats.timed(self.heuristic)
+        update = heuristic.update
+        neighbors, tile_at, move = codec.neighbors, codec.tile_at, codec.move
+
+        weight = self.initial_weight
+        h_start = heuristic(start_node)
+        g_score = {start_node: 0}
+        came_from = {}
+        # Liste ouverte : (g + w * h, -g, état, case vide, h) ; à f égal, le plus profond d'abord
+        open_heap = [(weight * h_start, 0, start_node, start_blank, h_start)]
+        closed = set()
+        incons = {}  # États améliorés après leur fermeture : réinsérés au changement de poids
+        # Heuristique incohérente (base de motifs) : un état fermé amélioré est rouvert tout de suite,
+        # sans quoi ni la borne publiée ni l'optimalité finale ne sont garanties
+        reopen = not getattr(self.heuristic, "consistent", False)
+        goal_g = float("inf")
+
+        expanded = generated = duplicates = stale_pops = 0
+        open_peak = 1
+        next_hook = stats.next_hook()
+
+        while True:
+            # --- ImprovePath : A* pondéré jusqu'à ce que le but soit le meilleur nœud ouvert ---
+            found_before = goal_g
+            while open_heap:
+                f, neg_g, current, blank_idx, h = open_heap[0]
+                if current in closed or -neg_g != g_score[current]:
+                    heapq.heappop(open_heap)  # Entrée périmée
+                    stale_pops += 1
+                    continue
+                if goal_g <= f:
+                    break  # Aucun nœud ouvert ne peut plus améliorer la solution pour ce poids
+                heapq.heappop(open_heap)
+                closed.add(current)
+                expanded += 1
+                if len(open_heap) > open_peak:
+                    open_peak = len(open_heap)
+
+                if expanded >= next_hook:
+                    stats.record(expanded, generated, duplicates, stale_pops, open_peak, len(g_score),
+                                 generated - duplicates + 1, weight)
+                    next_hook = stats.fire(expanded)
+
+                # Budget de temps épuisé : on s'arrête dès qu'une solution est connue
+                if deadline is not None and self.best_path is not None and expanded & 255 == 0 \
+                        and time.perf_counter() >= deadline:
+                    stats.record(expanded, generated, duplicates, stale_pops, open_peak, len(g_score),
+                                 generated - duplicates + 1, weight)
+                    return
+
+                tentative_g_score = -neg_g + 1
+                for neighbor_idx in neighbors[blank_idx]:
+                    tile = tile_at(current, neighbor_idx)
+                    neighbor = move(current, blank_idx, neighbor_idx)
+                    generated += 1
+                    if neighbor in g_score and tentative_g_score >= g_score[neighbor]:
+                        duplicates += 1
+                        continue
+
+                    g_score[neighbor] = tentative_g_score
+                    came_from[neighbor] = current
+                    neighbor_h = update(current, h, tile, neighbor_idx, blank_idx)
+                    if neighbor == target_node:
+                        goal_g = tentative_g_score
+                    if neighbor in closed and not reopen:
+                        # Déjà fermé pour ce poids : sera reconsidéré à la prochaine itération
+                        incons[neighbor] = (neighbor_idx, neighbor_h)
+                    else:
+                        closed.discard(neighbor)
+                        heapq.heappush(open_heap, (tentative_g_score + weight * neighbor_h, -tentative_g_score,
+                                                   neighbor, neighbor_idx, neighbor_h))
+
+            # --- Publication de la solution et de sa borne de sous-optimalité ---
+            # Nœuds encore ouverts ou incohérents (dédoublonnés, entrées périmées ignorées)
+            pending = {state: (blank, h) for _, neg_g, state, blank, h in open_heap
+                       if state not in closed and -neg_g == g_score[state]}
+            pending.update(incons)
+            if goal_g < float("inf"):
+                lower_bound = min((g_score[state] + h for state, (_, h) in pending.items()), default=goal_g)
+                bound = min(weight, goal_g / lower_bound) if lower_bound > 0 else 1.0
+                if weight <= 1.0 or not pending:
+                    bound = 1.0  # A* non pondéré terminé (ou espace épuisé) : solution optimale
+                if goal_g < found_before or bound < self.bound:
+                    self.best_path = self._reconstruct(came_from, start_blank, target_node)
+                    self.bound = bound
+                    stats.record(expanded, generated, duplicates, stale_pops, open_peak, len(g_score),
+                                 generated - duplicates + 1, weight)
+                    yield self.best_path, self.bound
+                if bound <= 1.0:
+                    return
+            elif not pending:
+                return  # Espace d'états épuisé sans solution
+
+            # --- Diminue le poids et reconstruit la liste ouverte (OPEN ∪ INCONS) ---
+            weight = max(1.0, weight - self.weight_step)
+            open_heap = [(g_score[state] + weight * h, -g_score[state], state, blank, h)
+                         for state, (blank, h) in pending.items()]
+            heapq.heapify(open_heap)
+            closed = set()
+            incons = {}
+
+    def _reconstruct(self, came_from, start_blank, target_node):
+        """Reconstruit le chemin jusqu'au but (déplacements de la case vide depuis 'start_blank')."""
+        path = []
+        temp = target_node
+        while temp in came_from:
+            path.append(temp)
+            temp = came_from[temp]
+        blanks = [self.codec.blank_index(node) for node in reversed(path)]
+        return MoveSequence.from_blanks(self.gw, start_blank, blanks)
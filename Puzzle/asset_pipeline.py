@@ -0,0 +1,147 @@
+import collections
+import hashlib
+import json
+import os
+import pathlib
+
+import pygame
+
+ATLAS_DIR = pathlib.Path(__file__).resolve().parent / "cache" / "atlas"
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+DECODED_IMAGES = 2  # Images décodées gardées en mémoire (l'image courante et la précédente)
+ATLAS_MAX_BYTES = 64 * 1024 * 1024  # Taille maximale du dossier des atlas (les moins récents sont supprimés)
+
+
+class AssetPipeline:
+    """
+    Chargement des images du puzzle, sans travail répété :
+
+    * les dernières images décodées (DECODED_IMAGES, la moins récemment utilisée est libérée)
+      restent en mémoire, ce qui permet de changer de grille sans relire le fichier ;
+    * l'image mise à l'échelle de la grille (l'« atlas » dont les tuiles sont des sous-surfaces)
+      est enregistrée sur disque, indexée par l'empreinte du fichier, la grille et la taille des
+      tuiles : aux lancements suivants, elle est relue telle quelle, sans décodage JPEG ni
+      redimensionnement. Au-delà de 'max_bytes' (ATLAS_MAX_BYTES), les atlas les moins récemment
+      utilisés sont supprimés ;
+    * les dimensions d'origine de chaque image sont aussi mémorisées sur disque : le calcul de la
+      grille au démarrage ne nécessite plus de décoder l'image.
+    """
+
+    def __init__(self, cache_dir=ATLAS_DIR, max_bytes=ATLAS_MAX_BYTES):
+        self.cache_dir = pathlib.Path(cache_dir) if cache_dir is not None else None
+        self.max_bytes = max_bytes
+        self._hashes = {}  # (chemin, date de modification, taille) -> empreinte du fichier
+        self._images = collections.OrderedDict()  # Empreinte -> image décodée, la plus récente en dernier
+        self._sizes = {}  # Empreinte -> (largeur, hauteur) de l'image d'origine
+        if self.cache_dir is not None and (self.cache_dir / "index.json").exists():
+            try:
+                self._sizes = {digest: tuple(size) for digest, size in
+                               json.loads((self.cache_dir / "index.json").read_text()).items()}
+            except ValueError:
+                pass  # Index illisible : il sera reconstruit
+
+    def image_hash(self, path):
+        """Empreinte du contenu du fichier (recalculée seulement s'il a été modifié)."""
+        stat = os.stat(path)
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        digest = self._hashes.get(key)
+        if digest is None:
+            digest = self._hashes[key] = hashlib.sha1(pathlib.Path(path).read_bytes()).hexdigest()[:20]
+        return digest
+
+    def _decode(self, path, digest):
+        """Décode le fichier (sauf s'il l'a été récemment) et mémorise ses dimensions d'origine."""
+        image = self._images.get(digest)
+        if image is not None:
+            self._images.move_to_end(digest)
+            return image
+        image = self._images[digest] = pygame.image.load(path)
+        while len(self._images) > DECODED_IMAGES:
+            self._images.popitem(last=False)
+        if digest not in self._sizes:
+            self._sizes[digest] = image.get_size()
+            self._save_index()
+        return image
+
+    def _save_index(self):
+        if self.cache_dir is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_dir / "index.json.tmp"
+        tmp_path.write_text(json.dumps(self._sizes))
+        os.replace(tmp_path, self.cache_dir / "index.json")
+
+    def image_size(self, path):
+        """Dimensions (largeur, hauteur) de l'image d'origine, ou None si elle est illisible."""
+        try:
+            digest = self.image_hash(path)
+            if digest not in self._sizes:
+                self._decode(path, digest)
+        except (OSError, pygame.error):
+            return None
+        return self._sizes[digest]
+
+    def scaled_image(self, path, grid_size, tile_size, size):
+        """
+        Image mise à l'échelle 'size' pour une grille et une taille de tuile données,
+        lue depuis le cache disque si possible. Renvoie None si l'image est illisible.
+        """
+        try:
+            digest = self.image_hash(path)
+        except OSError:
+            return None
+        gw, gh = grid_size
+        cache_path = None
+        if self.cache_dir is not None:
+            cache_path = self.cache_dir / f"{digest}_{gw}x{gh}_{tile_size}.rgb"
+            if cache_path.exists():
+                raw = cache_path.read_bytes()
+                if len(raw) == size[0] * size[1] * 3:
+                    os.utime(cache_path)  # Récemment utilisé : supprimé en dernier (voir _prune)
+                    return self._display_format(pygame.image.frombytes(raw, size, "RGB"))
+
+        try:
+            image = pygame.transform.smoothscale(self._decode(path, digest), size)
+        except pygame.error:
+            return None
+        if cache_path is not None:
+            # Pixels bruts : relus sans décodage (écriture atomique, un lancement concurrent lit
+            # soit l'ancien fichier, soit le nouveau)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".tmp")
+            tmp_path.write_bytes(pygame.image.tobytes(image, "RGB"))
+            os.replace(tmp_path, cache_path)
+            self._prune()
+        return self._display_format(image)
+
+    def _prune(self):
+        """Supprime les atlas les moins récemment utilisés jusqu'à revenir sous 'max_bytes'."""
+        atlases = []
+        for atlas in self.cache_dir.glob("*.rgb"):
+            try:
+                stat = atlas.stat()
+            except OSError:
+                continue  # Supprimé entre-temps par un autre lancement
+            atlases.append((stat.st_mtime_ns, stat.st_size, atlas))
+        total = sum(size for _, size, _ in atlases)
+        for _, size, atlas in sorted(atlases):
+            if total <= self.max_bytes:
+                break
+            try:
+                atlas.unlink()
+            except OSError:
+                continue
+            total -= size
+
+    @staticmethod
+    def _display_format(surface):
+        """Convertit au format de l'écran (blits plus rapides) si la fenêtre existe déjà."""
+        return surface.convert() if pygame.display.get_surface() is not None else surface
+
+
+def list_images(directory):
+    """Images disponibles dans un dossier, triées par nom."""
+    directory = pathlib.Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(path for path in directory.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
@@ -0,0 +1,188 @@
+"""
+Résolution en lot, sans interface graphique.
+
+Chaque ligne du fichier d'entrée décrit une grille : "LARGEUR HAUTEUR v0 v1 ... vN-1"
+(espaces ou virgules ; la case vide vaut N-1 ; lignes vides et commentaires '#' ignorés).
+Les résultats sont écrits au fil de l'eau au format JSONL, une ligne par grille :
+
+    python batch_solve.py grilles.txt -o solutions.jsonl --time-limit 30 --memory-limit 2048
+
+Avec --resume, les grilles déjà présentes dans le fichier de sortie ne sont pas recalculées.
+Avec --cache, les solutions optimales sont conservées sur disque (voir solution_cache.py) :
+une grille déjà résolue, ou située sur le chemin d'une solution connue, est lue sans recherche.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from board import Board
+from pattern_db import load_pattern_database
+from puzzle_astar import SearchCancelled
+from solution_cache import CACHE_PATH, SolutionCache
+from solver_worker import ENGINES
+
+try:
+    import resource  # Limite mémoire par processus (Unix uniquement)
+except ImportError:
+    resource = None
+
+_cache = None  # Cache des solutions du processus courant (voir _init_worker)
+
+
+def parse_instances(lines):
+    """Génère les couples (numéro de ligne, (gw, gh), état) des lignes non vides du fichier."""
+    for line_no, line in enumerate(lines, start=1):
+        line = line.split("#", 1)[0].replace(",", " ").strip()
+        if not line:
+            continue
+        values = [int(token) for token in line.split()]
+        gw, gh, state = values[0], values[1], values[2:]
+        if sorted(state) != list(range(gw * gh)):
+            raise ValueError(f"Ligne {line_no} : l'état n'est pas une permutation de 0..{gw * gh - 1}")
+        yield line_no, (gw, gh), state
+
+
+def _init_worker(memory_limit, cache_path=None):
+    """
+    Initialise un processus du pool : applique la limite mémoire (en octets) s'il y en a une
+    et ouvre le cache de solutions partagé sur disque si 'cache_path' est donné.
+    """
+    global _cache
+    if memory_limit and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    if cache_path is not None:
+        _cache = SolutionCache(path=cache_path)
+
+
+def solve_instance(job):
+    """Résout une grille dans un processus du pool et renvoie l'enregistrement JSON correspondant."""
+    instance_id, grid_size, state, engine, heuristic, time_limit, options = job
+    record = {"id": instance_id, "grid": list(grid_size), "state": state}
+    start_time = time.perf_counter()
+    deadline = None if time_limit is None else start_time + time_limit
+
+    def on_progress(stats):
+        # Interrompt la recherche une fois la limite de temps dépassée
+        if deadline is not None and time.perf_counter() > deadline:
+            raise SearchCancelled()
+
+    solver = path = None
+    try:
+        solver = ENGINES[engine](Board(grid_size, state), heuristic, on_progress, 1000, **options)
+        path = solver.solve() if _cache is None else _cache.solve(solver)
+    except SearchCancelled:
+        # Moteur 'anytime' : la meilleure solution trouvée avant la limite reste valable (non prouvée)
+        path = getattr(solver, "best_path", None)
+        if path is None:
+            record["status"] = "timeout"
+    except MemoryError:
+        record["status"] = "memory"
+    except Exception as error:
+        record["status"] = "error"
+        record["error"] = repr(error)
+
+    if "status" not in record:
+        if path is None:
+            record["status"] = "unsolvable"
+        else:
+            record["status"] = "solved"
+            record["moves"] = str(path)  # Déplacements de la case vide (U/D/L/R, voir move_sequence.py)
+            record["length"] = len(path)
+            if engine == "anytime":
+                # Borne de sous-optimalité (1.0 = optimale, y compris pour une solution lue dans le cache)
+                record["bound"] = solver.bound if solver.best_path is not None else 1.0
+
+    record["nodes_expanded"] = solver.stats.nodes_expanded if solver is not None else 0
+    record["spilled_bytes"] = solver.stats.spilled_bytes if solver is not None else 0
+    record["source"] = solver.stats.source if solver is not None else "search"
+    record["time"] = round(time.perf_counter() - start_time, 6)
+    return record
+
+
+def load_done_ids(output_path):
+    """
+    Lit un fichier de sortie partiellement écrit et renvoie les identifiants déjà traités.
+    Une dernière ligne tronquée (arrêt brutal pendant l'écriture) est supprimée du fichier.
+    """
+    done = set()
+    valid_size = 0
+    with open(output_path, "rb") as f:
+        for raw_line in f:
+            if not raw_line.endswith(b"\n"):
+                break
+            try:
+                done.add(json.loads(raw_line)["id"])
+            except (ValueError, KeyError):
+                break
+            valid_size += len(raw_line)
+    os.truncate(output_path, valid_size)
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Résout un lot de grilles en parallèle (sortie JSONL).")
+    parser.add_argument("input", help="fichier des grilles (une par ligne), '-' pour l'entrée standard")
+    parser.add_argument("-o", "--output", help="fichier JSONL de sortie (par défaut : sortie standard)")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="idastar")
+    parser.add_argument("--heuristic", default="linear_conflict",
+                        help="'manhattan', 'linear_conflict' ou 'pdb'")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="nombre de processus (par défaut : un par cœur)")
+    parser.add_argument("--time-limit", type=float, help="limite de temps par grille, en secondes")
+    parser.add_argument("--memory-limit", type=int, help="limite mémoire par processus, en Mo")
+    parser.add_argument("--cache", nargs="?", const=str(CACHE_PATH),
+                        help="cache de solutions sur disque (par défaut : cache/solutions.db)")
+    parser.add_argument("--resume", action="store_true",
+                        help="reprend un fichier de sortie existant sans recalculer ses grilles")
+    args = parser.parse_args(argv)
+
+    if args.input == "-":
+        instances = list(parse_instances(sys.stdin))
+    else:
+        with open(args.input) as f:
+            instances = list(parse_instances(f))
+
+    done = set()
+    if args.output and args.resume and os.path.exists(args.output):
+        done = load_done_ids(args.output)
+    if args.memory_limit and resource is None:
+        print("AVERTISSEMENT : limite mémoire non prise en charge sur ce système.", file=sys.stderr)
+
+    if args.heuristic == "pdb":
+        # Construit les bases de motifs manquantes une seule fois, avant de lancer les processus
+        for gw, gh in sorted({grid_size for _, grid_size, _ in instances}):
+            load_pattern_database(gw, gh).close()
+
+    # Le moteur 'parallel' répartit lui-même chaque recherche sur 'workers' processus : les grilles
+    # sont alors résolues une à une dans le processus principal (les processus d'un pool, démons,
+    # ne pourraient pas créer le leur)
+    options = {"workers": args.workers} if args.engine == "parallel" else {}
+    jobs = [(instance_id, grid_size, state, args.engine, args.heuristic, args.time_limit, options)
+            for instance_id, grid_size, state in instances if instance_id not in done]
+    memory_limit = args.memory_limit * 1024 * 1024 if args.memory_limit else None
+
+    out = open(args.output, "a" if args.resume else "w") if args.output else sys.stdout
+    pool = None
+    try:
+        if args.engine == "parallel":
+            _init_worker(memory_limit, args.cache)
+            records = map(solve_instance, jobs)
+        else:
+            pool = multiprocessing.Pool(args.workers, _init_worker, (memory_limit, args.cache))
+            records = pool.imap_unordered(solve_instance, jobs)
+        # Chaque résultat est écrit (et vidé sur disque) dès qu'il arrive, dans n'importe quel ordre
+        for record in records:
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Banc d'essai reproductible des solveurs.
+
+Les jeux d'instances sont générés avec des graines fixes : les mêmes grilles sont
+résolues à chaque exécution. Pour chaque (jeu, moteur, heuristique), le banc mesure
+les nœuds développés, les nœuds/s, le pic de mémoire (RSS) et le temps réel :
+
+    python benchmark.py --save-baseline benchmarks/baseline.json
+    python benchmark.py --compare benchmarks/baseline.json --threshold 0.10
+
+Le jeu '4x4' (hors des jeux par défaut : la base de motifs 4x4 se construit en une dizaine de
+minutes) tire ses grilles dans la bande "easy" : des 4x4 tirées uniformément dépasseraient la
+limite de temps de la plupart des moteurs. Le jeu 'korf100' lit les 100 instances standard de Korf (15-puzzle) depuis --korf-file,
+au format habituel (une instance par ligne, 16 valeurs, éventuellement précédées d'un numéro,
+case vide = 0 et état résolu 0 1 2 ... 15).
+"""
+import argparse
+import json
+import multiprocessing
+import pathlib
+import random
+import sys
+import time
+
+from board import Board, compute_grid_size
+from pattern_db import load_pattern_database
+from puzzle_astar import SearchCancelled
+from scramble import DIFFICULTIES, random_solvable_state, scramble
+from solver_worker import ENGINES
+
+try:
+    import resource  # Pic de mémoire des processus de mesure (Unix uniquement)
+except ImportError:
+    resource = None
+
+DEFAULT_BASELINE = pathlib.Path(__file__).resolve().parent / "benchmarks" / "baseline.json"
+
+# Dimensions (largeur, hauteur) des images de assets/ : les grilles non carrées du jeu en dérivent
+ASSET_IMAGE_SIZES = [(1920, 1133), (1920, 1080), (850, 1218)]
+
+# Jeux d'instances générées : nom -> (grilles, nombre d'instances par grille)
+INSTANCE_SETS = {
+    "3x3": ([(3, 3)], 20),
+    "2x4": ([(2, 4)], 20),
+    "3x4": ([(3, 4)], 10),
+    "aspect": (sorted({compute_grid_size(w, h, base) for w, h in ASSET_IMAGE_SIZES for base in (3, 4)}), 5),
+    "4x4": ([(4, 4)], 20),
+}
+# Bande de difficulté par défaut des jeux trop difficiles en tirage uniforme (voir scramble.py)
+SET_DIFFICULTIES = {
+    "4x4": "easy",
+}
+
+
+def generate_instances(set_name, difficulty=None):
+    """
+    Renvoie la liste [(grille, état)] d'un jeu d'instances, identique d'une exécution à l'autre.
+    Avec 'difficulty' (par défaut celle du jeu dans SET_DIFFICULTIES), les grilles sont tirées dans
+    la bande de distance optimale correspondante (voir scramble.py), sans limite de temps pour que
+    le tirage reste reproductible ; RuntimeError si la bande n'est pas atteinte.
+    """
+    grids, count = INSTANCE_SETS[set_name]
+    difficulty = difficulty or SET_DIFFICULTIES.get(set_name)
+    instances = []
+    for gw, gh in grids:
+        if difficulty is None:
+            rng = random.Random(f"{set_name}-{gw}x{gh}")  # Graine fixe propre au jeu et à la grille
+            instances.extend(((gw, gh), random_solvable_state(rng, gw, gh)) for _ in range(count))
+        else:
+            rng = random.Random(f"{set_name}-{gw}x{gh}-{difficulty}")
+            for _ in range(count):
+                state, _, _, in_band = scramble(rng, (gw, gh), difficulty, time_budget=None)
+                if not in_band:
+                    raise RuntimeError(f"Aucune grille {gw}x{gh} trouvée dans la bande '{difficulty}'")
+                instances.append(((gw, gh), state))
+    return instances
+
+
+def load_korf_instances(path):
+    """
+    Lit les instances de Korf et les convertit vers la convention du jeu par une rotation de 180° :
+    la case p devient 15 - p et la tuile t devient 15 - t (la case vide 0 devient 15).
+    La rotation préserve les voisinages, donc les longueurs de solution optimales.
+    """
+    instances = []
+    with open(path) as f:
+        for line in f:
+            values = [int(token) for token in line.split()]
+            if not values:
+                continue
+            korf_state = values[-16:]  # Ignore un éventuel numéro d'instance en tête de ligne
+            state = [0] * 16
+            for pos, tile in enumerate(korf_state):
+                state[15 - pos] = 15 - tile
+            instances.append(((4, 4), state))
+    return instances
+
+
+def _peak_rss_kb():
+    """Pic de mémoire résidente du processus courant, en kilo-octets."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS compte en octets
+
+
+def _measure(conn, grid_size, state, engine, heuristic, time_limit):
+    """Résout une instance dans un processus neuf et renvoie ses mesures par 'conn'."""
+    start_time = time.perf_counter()
+
+    def on_progress(stats):
+        if time.perf_counter() - start_time > time_limit:
+            raise SearchCancelled()
+
+    # Les tables de distances répondraient sans recherche : le banc d'essai mesure la recherche
+    solver = ENGINES[engine](Board(grid_size, state), heuristic, on_progress, 1000, use_table=False)
+    try:
+        path = solver.solve()
+        status = "solved" if path is not None else "unsolvable"
+    except SearchCancelled:
+        path, status = None, "timeout"
+    wall_time = time.perf_counter() - start_time
+    stats = solver.stats
+    conn.send({
+        "status": status,
+        "length": len(path) if path is not None else None,
+        "nodes_expanded": stats.nodes_expanded,
+        "nodes_generated": stats.nodes_generated,
+        "duplicates": stats.duplicates,
+        "stale_pops": stats.stale_pops,
+        "open_peak": stats.open_peak,
+        "wall_time": wall_time,
+        "peak_rss_kb": _peak_rss_kb(),
+    })
+
+
+def run_instance(grid_size, state, engine, heuristic, time_limit):
+    """Lance la mesure d'une instance dans un processus séparé (pic RSS propre à l'instance)."""
+    parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_measure,
+                                      args=(child_conn, grid_size, state, engine, heuristic, time_limit))
+    process.start()
+    try:
+        if parent_conn.poll(time_limit + 30):
+            return parent_conn.recv()
+        return {"status": "timeout"}  # Processus bloqué au-delà de la limite (hors points de progression)
+    except EOFError:
+        return {"status": "error"}  # Processus arrêté sans envoyer de mesure (plantage, mémoire épuisée)
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join(5)
+
+
+def run_benchmark(instance_sets, engines, heuristics, time_limit, verbose=True):
+    """Exécute toutes les combinaisons et renvoie {"jeu/moteur/heuristique": mesures agrégées}."""
+    results = {}
+    for set_name, instances in instance_sets.items():
+        if "pdb" in heuristics:
+            # Construit les bases de motifs à l'avance : leur construction ne doit pas être chronométrée
+            for gw, gh in sorted({grid for grid, _ in instances}):
+                load_pattern_database(gw, gh).close()
+
+        for engine in engines:
+            for heuristic in heuristics:
+                runs = [run_instance(grid, state, engine, heuristic, time_limit) for grid, state in instances]
+                solved = [run for run in runs if run["status"] == "solved"]
+                nodes = sum(run["nodes_expanded"] for run in solved)
+                wall_time = sum(run["wall_time"] for run in solved)
+                rss = [run["peak_rss_kb"] for run in runs if run.get("peak_rss_kb") is not None]
+                key = f"{set_name}/{engine}/{heuristic}"
+                results[key] = {
+                    "instances": len(runs),
+                    "solved": len(solved),
+                    "nodes_expanded": nodes,
+                    "nodes_generated": sum(run["nodes_generated"] for run in solved),
+                    "duplicates": sum(run["duplicates"] for run in solved),
+                    "stale_pops": sum(run["stale_pops"] for run in solved),
+                    "open_peak": max((run["open_peak"] for run in solved), default=0),
+                    "wall_time": round(wall_time, 4),
+                    "nodes_per_sec": round(nodes / wall_time) if wall_time > 0 else None,
+                    "peak_rss_kb": max(rss) if rss else None,
+                }
+                if verbose:
+                    r = results[key]
+                    print(f"{key:<32} résolues {r['solved']:>3}/{r['instances']:<3} "
+                          f"nœuds {r['nodes_expanded']:>10}  {r['nodes_per_sec'] or 0:>8} nœuds/s  "
+                          f"pic RSS {r['peak_rss_kb'] or 0:>8} Ko  temps {r['wall_time']:.3f} s")
+    return results
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compare aux mesures de référence et renvoie la liste des régressions :
+    moins d'instances résolues, ou nœuds / temps / pic RSS en hausse de plus de 'threshold'.
+    """
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if current["solved"] < reference["solved"]:
+            regressions.append(f"{key} : {current['solved']} instances résolues (référence {reference['solved']})")
+            continue
+        for metric in ("nodes_expanded", "wall_time", "peak_rss_kb"):
+            old, new = reference.get(metric), current.get(metric)
+            if old and new is not None and new > old * (1 + threshold):
+                regressions.append(f"{key} : {metric} {new} (référence {old}, +{(new / old - 1) * 100:.1f} %)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai reproductible des solveurs.")
+    parser.add_argument("--sets", default="3x3,2x4,3x4,aspect",
+                        help=f"jeux d'instances parmi {', '.join(INSTANCE_SETS)}, korf100")
+    parser.add_argument("--engines", default=",".join(ENGINES))
+    parser.add_argument("--heuristics", default="manhattan,linear_conflict,pdb")
+    parser.add_argument("--difficulty", choices=sorted(DIFFICULTIES),
+                        help="tire les grilles des jeux générés dans une bande de difficulté")
+    parser.add_argument("--korf-file", help="fichier des 100 instances de Korf (jeu 'korf100')")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="limite par instance, en secondes")
+    parser.add_argument("--save-baseline", nargs="?", const=str(DEFAULT_BASELINE),
+                        help="enregistre les mesures comme nouvelle référence")
+    parser.add_argument("--compare", nargs="?", const=str(DEFAULT_BASELINE),
+                        help="compare à une référence et signale les régressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="tolérance relative (0.10 = 10 %%)")
+    parser.add_argument("--output", help="écrit aussi les mesures dans ce fichier JSON")
+    args = parser.parse_args(argv)
+
+    instance_sets = {}
+    for set_name in args.sets.split(","):
+        if set_name == "korf100":
+            if not args.korf_file:
+                parser.error("le jeu 'korf100' nécessite --korf-file")
+            instance_sets[set_name] = load_korf_instances(args.korf_file)
+        elif set_name in INSTANCE_SETS:
+            # Les mesures d'une bande de difficulté ne se comparent qu'aux mesures de la même bande
+            name = set_name if args.difficulty is None else f"{set_name}-{args.difficulty}"
+            instance_sets[name] = generate_instances(set_name, args.difficulty)
+        else:
+            parser.error(f"jeu d'instances inconnu : '{set_name}'")
+
+    results = run_benchmark(instance_sets, args.engines.split(","), args.heuristics.split(","), args.time_limit)
+
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        path = pathlib.Path(args.save_baseline)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2))
+        print(f"Référence enregistrée dans '{path}'.")
+    if args.compare:
+        baseline = json.loads(pathlib.Path(args.compare).read_text())
+        regressions = find_regressions(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"RÉGRESSION : {regression}")
+        if regressions:
+            sys.exit(1)
+        print("Aucune régression.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import random
+
+from scramble import is_solvable_state, random_solvable_state, scramble
+
+
+def compute_grid_size(img_w, img_h, base_tiles):
+    """
+    Calcule la taille de grille (largeur, hauteur) adaptée aux proportions d'une image.
+    L'une des dimensions est fixée à base_tiles, l'autre est calculée.
+    """
+    # Calcule le ratio Hauteur/Largeur de l'image
+    aspect_ratio = img_h / img_w
+
+    if img_w >= img_h:
+        # Image 'Paysage' ou Carrée (Largeur >= Hauteur)
+        return base_tiles, max(1, round(base_tiles * aspect_ratio))
+    # Image 'Portrait' (Hauteur > Largeur)
+    return max(1, round(base_tiles / aspect_ratio)), base_tiles
+
+
+class Board:
+    """
+    Modèle du puzzle, sans affichage ni dépendance à pygame : grille, état, case vide, mouvements,
+    solvabilité et victoire. L'état est une liste de nombres où l'index représente la position sur
+    la grille et la valeur la tuile à cette position (la case vide est la dernière valeur).
+
+    Puzzle (game_ui.py) en hérite pour l'afficher ; les solveurs, les processus de résolution et
+    les outils en ligne de commande n'utilisent que ce modèle.
+    """
+
+    def __init__(self, grid_size, state=None):
+        self.moves = 0  # Compteur de mouvements
+        self.resize(grid_size)
+        if state is not None:
+            self.state = list(state)
+
+    def resize(self, grid_size):
+        """Change la taille de la grille et remet le puzzle à l'état résolu."""
+        self.gs = tuple(grid_size)  # Taille de la grille (gw, gh)
+        self.gw, self.gh = self.gs  # Largeur (gw) et Hauteur (gh) de la grille
+        self.tile_count = self.gw * self.gh  # Nombre total de tuiles
+        self.blank_value = self.tile_count - 1  # La valeur représentant la tuile vide (la dernière)
+
+        # L'état initial résolu : liste [0, 1, 2, ..., N-1]
+        self.state = list(range(self.tile_count))
+        self.solved_state = self.state[:]  # Sauvegarde de l'état résolu
+        self.moves = 0
+
+    def copy(self):
+        """Copie indépendante du modèle (même grille, même état, même compteur)."""
+        board = Board(self.gs, self.state)
+        board.moves = self.moves
+        return board
+
+    @property
+    def blank(self):
+        """Position de la case vide."""
+        return self.state.index(self.blank_value)
+
+    def neighbors(self, pos):
+        """Positions adjacentes (haut, bas, gauche, droite) à la position 'pos'."""
+        x, y = pos % self.gw, pos // self.gw
+        return [(y + dy) * self.gw + x + dx for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0))
+                if 0 <= x + dx < self.gw and 0 <= y + dy < self.gh]
+
+    def legal_moves(self):
+        """Positions des tuiles qui peuvent glisser dans la case vide."""
+        return self.neighbors(self.blank)
+
+    def move(self, pos):
+        """
+        Fait glisser la tuile de la position 'pos' dans la case vide si elles sont adjacentes.
+        Renvoie True si le mouvement a eu lieu.
+        """
+        blank = self.blank
+        if pos not in self.neighbors(blank):
+            return False
+        self.state[blank], self.state[pos] = self.state[pos], self.state[blank]
+        self.moves += 1
+        return True
+
+    def shuffle(self, difficulty=None, rng=random):
+        """
+        Mélange le puzzle en un état résoluble : tirage uniforme direct, ou état dont la distance
+        optimale tombe dans la bande de difficulté demandée ("easy", "medium", "hard", voir scramble.py).
+        Renvoie False si la bande n'a pas été atteinte dans le temps imparti (état le plus proche).
+        """
+        self.moves = 0
+        if difficulty is None:
+            self.state = random_solvable_state(rng, self.gw, self.gh)
+            return True
+        self.state, _, _, in_band = scramble(rng, self.gs, difficulty)
+        return in_band
+
+    def is_solvable(self):
+        """Vérifie si la configuration actuelle est résoluble (parité des inversions, en O(n log n))."""
+        return is_solvable_state(self.gs, self.state)
+
+    def is_win(self):
+        """Vérifie si l'état actuel correspond à l'état résolu."""
+        return self.state == self.solved_state
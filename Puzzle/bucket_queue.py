@@ -0,0 +1,48 @@
+class BucketQueue:
+    """
+    File de priorité à seaux pour des priorités entières petites (f = g + h du solveur).
+    Les éléments sont rangés dans _buckets[f][g] : on retire toujours le plus petit f,
+    et à f égal le plus grand g (nœud le plus profond, donc le plus proche du but).
+    Ajout et retrait sont en O(1) amorti, sans comparaison des états eux-mêmes.
+    """
+
+    def __init__(self):
+        self._buckets = []  # _buckets[f][g] = pile des éléments de priorité (f, g)
+        self._min_f = 0  # Plus petit f pouvant encore contenir des éléments
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, f, g, item):
+        """Ajoute 'item' avec la priorité (f, g)."""
+        buckets = self._buckets
+        while len(buckets) <= f:
+            buckets.append([])
+        layer = buckets[f]
+        while len(layer) <= g:
+            layer.append([])
+        layer[g].append(item)
+
+        if f < self._min_f:
+            self._min_f = f
+        self._size += 1
+
+    def pop(self):
+        """Retire et renvoie (f, g, item) de plus petit f, puis de plus grand g."""
+        if not self._size:
+            raise IndexError("pop depuis une BucketQueue vide")
+
+        buckets = self._buckets
+        while True:
+            layer = buckets[self._min_f]
+            # Supprime les seaux g vides en fin de couche (coût amorti sur les ajouts)
+            while layer and not layer[-1]:
+                layer.pop()
+            if layer:
+                break
+            self._min_f += 1
+
+        self._size -= 1
+        g = len(layer) - 1
+        return self._min_f, g, layer[g].pop()
@@ -0,0 +1,277 @@
+import math
+import mmap
+import pathlib
+import struct
+import sys
+
+from move_sequence import MoveSequence
+from packed_state import StateCodec
+
+# --- Format binaire ---
+# En-tête : MAGIC, puis (gw, gh) en octets non signés ; ensuite un octet de distance par état
+# résoluble, dans l'ordre des rangs de StateRanker.
+MAGIC = b"DST1"
+HEADER_SIZE = 6
+UNREACHED = 0xFF  # Valeur des états jamais atteints
+
+# Au-delà, la table n'est pas construite sans le demander explicitement (3x4 : 239 millions d'états)
+MAX_TABLE_STATES = 20_000_000
+
+# Répertoire par défaut des tables de distances (créé à la première construction)
+TABLE_DIR = pathlib.Path(__file__).resolve().parent / "tables"
+
+_loaded = {}  # (gw, gh) -> table ouverte par find_distance_table (une seule par processus)
+
+
+def _numpy():
+    """
+    Importe NumPy à la demande : il n'est nécessaire que pour construire les tables, et la lecture
+    (mmap) s'en passe. Les processus de résolution ne paient donc pas son temps d'importation.
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("NumPy est nécessaire pour construire les tables de distances") from None
+    return numpy
+
+
+def default_path(gw, gh):
+    """Chemin du fichier de table de distances d'une grille."""
+    return TABLE_DIR / f"dist_{gw}x{gh}.bin"
+
+
+class StateRanker:
+    """
+    Hachage parfait des états résolubles vers 0 .. n!/2 - 1 (rang de Lehmer) :
+    rang = case vide * (m!/2) + (rang lexicographique des m tuiles lues hors case vide) // 2.
+
+    Le dernier chiffre de Lehmer utile (poids 1) ne fait que fixer la parité des inversions ;
+    pour une position de la case vide, la règle de solvabilité impose cette parité, d'où la
+    division par deux sans perte. Les déplacements horizontaux de la case vide ne changent pas
+    l'ordre de lecture des tuiles : leur rang s'obtient par une simple addition de ±m!/2.
+    """
+
+    def __init__(self, gw, gh):
+        self.gw, self.gh = gw, gh
+        self.n = gw * gh
+        self.m = self.n - 1  # Nombre de tuiles hors case vide
+        self.blank_value = self.m
+        self.block = max(1, math.factorial(self.m) // 2)  # Nombre de rangs par position de la case vide
+        self.size = self.n * self.block  # Nombre d'états résolubles
+        # Poids (divisés par deux) des chiffres de Lehmer 0 .. m-3
+        self.weights = [math.factorial(self.m - 1 - i) // 2 for i in range(self.m - 2)]
+        # Parité des inversions imposée par la règle de solvabilité, selon la position de la case vide
+        self.parity = [0 if gw % 2 == 1 else (gh - 1 - blank // gw) % 2 for blank in range(self.n)]
+
+    def rank(self, state):
+        """Rang d'un état résoluble (séquence position -> valeur)."""
+        blank = state.index(self.blank_value)
+        index = 0
+        seen = 0  # Bit v : tuile v déjà lue
+        for weight, tile in zip(self.weights, (value for value in state if value != self.blank_value)):
+            # Tuiles plus petites lues après celle-ci = plus petites au total - déjà lues
+            index += weight * (tile - (seen & ((1 << tile) - 1)).bit_count())
+            seen |= 1 << tile
+        return blank * self.block + index
+
+    # --- Versions vectorisées (NumPy), sur des frontières entières ---
+
+    def rank_many(self, states):
+        """Rangs d'un tableau d'états (F x n), chaque ligne contenant exactement une case vide."""
+        np = _numpy()
+        blanks = np.argmax(states == self.blank_value, axis=1)
+        tiles = states[states != self.blank_value].reshape(len(states), self.m)
+        ranks = blanks.astype(np.int64) * self.block
+        for i, weight in enumerate(self.weights):
+            ranks += weight * (tiles[:, i + 1:] < tiles[:, i:i + 1]).sum(axis=1)
+        return ranks
+
+    def unrank_many(self, ranks):
+        """États (F x n, uint8) correspondant à un tableau de rangs."""
+        np = _numpy()
+        count = len(ranks)
+        rows = np.arange(count)
+        blanks, rest = np.divmod(ranks, self.block)
+        digits = np.zeros((count, self.m), np.int64)
+        for i, weight in enumerate(self.weights):
+            digits[:, i], rest = np.divmod(rest, weight)
+        if self.m >= 2:
+            # Chiffre de poids 1 : complète la parité imposée par la position de la case vide
+            parity = np.array(self.parity, np.int64)[blanks]
+            digits[:, self.m - 2] = (parity - digits.sum(axis=1)) % 2
+
+        # Chiffre i : la valeur choisie est la digits[i]-ième des valeurs encore disponibles
+        available = np.ones((count, self.m), bool)
+        tiles = np.empty((count, self.m), np.uint8)
+        for i in range(self.m):
+            chosen = np.argmax(np.cumsum(available, axis=1) == digits[:, i:i + 1] + 1, axis=1)
+            tiles[:, i] = chosen
+            available[rows, chosen] = False
+
+        # Réinsère la case vide à sa position
+        states = np.empty((count, self.n), np.uint8)
+        for pos in range(self.n):
+            states[:, pos] = np.where(pos < blanks, tiles[:, min(pos, self.m - 1)],
+                                      np.where(pos == blanks, self.blank_value, tiles[:, max(pos - 1, 0)]))
+        return states
+
+
+def build_distance_table(gw, gh, max_states=MAX_TABLE_STATES, verbose=False):
+    """
+    Distance optimale de chaque état résoluble (un octet par état, indexé par StateRanker),
+    par parcours en largeur à rebours depuis l'état résolu, couche par couche : chaque frontière
+    est décodée, développée et reclassée en une poignée d'opérations NumPy.
+    """
+    np = _numpy()
+    ranker = StateRanker(gw, gh)
+    if ranker.size > max_states:
+        raise ValueError(f"Grille {gw}x{gh} trop grande : {ranker.size} états (limite {max_states})")
+    n, block = ranker.n, ranker.block
+    table = np.full(ranker.size, UNREACHED, np.uint8)
+    frontier = np.array([ranker.rank(list(range(n)))], np.int64)
+    table[frontier] = 0
+    depth = 0
+
+    while frontier.size:
+        states = ranker.unrank_many(frontier)
+        blanks = frontier // block
+        successors = []
+        for delta in (-1, 1):
+            # Déplacement horizontal : même ordre de lecture des tuiles, seul le bloc change
+            targets = blanks + delta
+            valid = (targets >= 0) & (targets < n) & (targets // gw == blanks // gw)
+            successors.append(frontier[valid] + delta * block)
+        for delta in (-gw, gw):
+            targets = blanks + delta
+            valid = (targets >= 0) & (targets < n)
+            moved = states[valid]
+            rows = np.arange(len(moved))
+            source, target = blanks[valid], targets[valid]
+            moved[rows, source] = moved[rows, target]
+            moved[rows, target] = ranker.blank_value
+            successors.append(ranker.rank_many(moved))
+
+        frontier = np.unique(np.concatenate(successors))
+        frontier = frontier[table[frontier] == UNREACHED]
+        depth += 1
+        table[frontier] = min(depth, UNREACHED - 1)
+        if verbose and frontier.size:
+            print(f"Distance {depth} : {frontier.size} états")
+    return table
+
+
+def write_distance_table(gw, gh, path=None, max_states=MAX_TABLE_STATES, verbose=False):
+    """Construit la table d'une grille et l'enregistre dans un fichier binaire."""
+    if path is None:
+        path = default_path(gw, gh)
+    path = pathlib.Path(path)
+    table = build_distance_table(gw, gh, max_states, verbose)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Écrit dans un fichier temporaire puis renomme, pour ne jamais laisser de fichier partiel
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("BB", gw, gh))
+        table.tofile(f)
+    tmp_path.replace(path)
+    return path
+
+
+class DistanceTable:
+    """
+    Table de distances exactes chargée par mmap (lecture seule, pages partagées entre processus).
+    Une solution optimale s'obtient par descente gloutonne : à chaque pas, un voisin à distance
+    d - 1 existe toujours, sans aucune recherche.
+    """
+
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:4] != MAGIC:
+            raise ValueError(f"Fichier de table de distances invalide : '{self.path}'")
+        self.gw, self.gh = struct.unpack_from("BB", self._mm, 4)
+        self.ranker = StateRanker(self.gw, self.gh)
+        if len(self._mm) != HEADER_SIZE + self.ranker.size:
+            raise ValueError(f"Table de distances tronquée : '{self.path}'")
+        self.neighbors = StateCodec(self.gw, self.gh).neighbors
+
+    def distance(self, state):
+        """Distance optimale d'un état résoluble (UNREACHED s'il n'a pas été atteint)."""
+        return self._mm[HEADER_SIZE + self.ranker.rank(state)]
+
+    def solve(self, state):
+        """Solution optimale de 'state' (MoveSequence), ou None si l'état n'est pas atteignable (ou insoluble)."""
+        ranker, mm = self.ranker, self._mm
+        state = list(state)
+        index = ranker.rank(state)
+        depth = mm[HEADER_SIZE + index]
+        if depth == UNREACHED:
+            return None
+        blank = start_blank = state.index(ranker.blank_value)
+        blanks = []
+        while depth > 0:
+            for pos in self.neighbors[blank]:
+                state[blank], state[pos] = state[pos], ranker.blank_value
+                if pos // self.gw == blank // self.gw:
+                    new_index = index + (pos - blank) * ranker.block  # Déplacement horizontal
+                else:
+                    new_index = ranker.rank(state)
+                if mm[HEADER_SIZE + new_index] == depth - 1:
+                    blank, index, depth = pos, new_index, depth - 1
+                    blanks.append(pos)
+                    break
+                state[pos], state[blank] = state[blank], ranker.blank_value
+            else:
+                return None  # Aucun voisin à d - 1 : état insoluble (son rang désigne un autre état)
+        return MoveSequence.from_blanks(self.gw, start_blank, blanks)
+
+    def close(self):
+        self._mm.close()
+
+
+def load_distance_table(gw, gh, path=None, build=True):
+    """
+    Charge (par mmap) la table de distances d'une grille ; la construit d'abord si elle
+    n'existe pas encore et que 'build' est vrai.
+    """
+    if path is None:
+        path = default_path(gw, gh)
+    path = pathlib.Path(path)
+    if not path.exists():
+        if not build:
+            raise FileNotFoundError(f"Table de distances introuvable : '{path}'")
+        write_distance_table(gw, gh, path)
+    return DistanceTable(path)
+
+
+def find_distance_table(gw, gh):
+    """Table de distances déjà construite pour cette grille (ouverte une seule fois), ou None."""
+    if (gw, gh) not in _loaded:
+        path = default_path(gw, gh)
+        _loaded[(gw, gh)] = DistanceTable(path) if path.exists() else None
+    return _loaded[(gw, gh)]
+
+
+def table_solution(puzzle, stats):
+    """
+    Solution optimale d'une grille résoluble lue dans la table de distances de sa taille, ou None
+    s'il n'y en a pas. Les statistiques 'stats' indiquent alors l'origine de la réponse : aucun nœud
+    développé, source "table".
+    """
+    table = find_distance_table(puzzle.gw, puzzle.gh)
+    if table is None:
+        return None
+    path = table.solve(puzzle.state)
+    stats.source = "table"
+    stats.record(0, 0, 0, 0, 0, 0, 0, len(path))
+    return path
+
+
+if __name__ == "__main__":
+    # Utilisation : python distance_table.py LARGEUR HAUTEUR
+    if len(sys.argv) != 3:
+        print("Utilisation : python distance_table.py LARGEUR HAUTEUR")
+        sys.exit(1)
+    width, height = int(sys.argv[1]), int(sys.argv[2])
+    print(f"Table de distances écrite dans '{write_distance_table(width, height, verbose=True)}'.")
@@ -0,0 +1,297 @@
+import bisect
+import heapq
+import itertools
+import os
+import tempfile
+
+from distance_table import table_solution
+from heuristics import make_heuristic
+from move_sequence import MoveSequence
+from packed_state import StateCodec
+from search_stats import SearchStats
+
+# Nombre maximal d'états gardés en mémoire par défaut (environ 50 octets chacun en Python)
+DEFAULT_MAX_STATES = 5_000_000
+CHUNK_STATES = 65536  # États lus ou écrits par bloc dans les fichiers de débordement
+
+
+def _unique(states):
+    """Supprime les répétitions consécutives d'un flux trié."""
+    previous = None
+    for state in states:
+        if state != previous:
+            yield state
+            previous = state
+
+
+def _difference(states, removed):
+    """Éléments du flux trié 'states' absents du flux trié 'removed' (fusion, sans ensemble en mémoire)."""
+    removed = iter(removed)
+    current = next(removed, None)
+    for state in states:
+        while current is not None and current < state:
+            current = next(removed, None)
+        if state != current:
+            yield state
+
+
+class _Bucket:
+    """
+    États d'un même couple (g, h) : tampon en mémoire, plus des fichiers triés (« runs »)
+    une fois le plafond de mémoire atteint.
+    """
+
+    __slots__ = ("buffer", "runs", "size", "expanded")
+
+    def __init__(self):
+        self.buffer = []  # États en mémoire (non triés, avec doublons, tant que le seau est ouvert)
+        self.runs = []  # Fichiers de débordement, chacun trié et sans doublon
+        self.size = 0  # Nombre total d'entrées, doublons compris
+        self.expanded = False  # Après développement : contenu trié et dédoublonné
+
+
+class ExternalAStarSolver:
+    """
+    A* à mémoire plafonnée, avec liste ouverte débordant sur disque (External A*).
+
+    Les états sont rangés dans des seaux (g, h) développés par f = g + h croissant, puis g
+    croissant. Aucun dictionnaire g_score : les doublons sont éliminés en différé, au moment de
+    développer un seau, par fusion de flux triés. Le graphe étant non orienté, biparti et à coûts
+    unitaires, un doublon d'un état de (g, h) ne peut se trouver que dans (g, h) lui-même ou dans
+    (g - 2, h). Dès que plus de 'max_states' états sont en mémoire, les plus gros tampons sont
+    triés et écrits dans des fichiers temporaires (dans 'spill_dir', par défaut le répertoire
+    temporaire du système) ; les volumes écrits sont comptés dans stats (spilled_states,
+    spilled_bytes, spill_files).
+
+    Le chemin est reconstruit à rebours à partir des seaux développés, sans pointeur de parent :
+    le prédécesseur d'un état à la profondeur g est celui de ses voisins présent dans un seau g - 1.
+
+    Avec une heuristique incohérente (base de motifs), h est corrigé par « pathmax » : un successeur
+    reçoit au moins h - 1. f ne décroît alors jamais d'un état à son successeur, aucun état n'est
+    ajouté à un seau déjà développé, et la première solution trouvée reste optimale ; un même état
+    peut en revanche figurer dans des seaux de h différents (doublons non éliminés, mais inoffensifs).
+    """
+
+    def __init__(self, puzzle_instance, heuristic="manhattan", progress_callback=None, progress_interval=1000,
+                 profile=False, max_states=DEFAULT_MAX_STATES, spill_dir=None, use_table=True):
+        self.puzzle = puzzle_instance
+        self.gw, self.gh = puzzle_instance.gs
+        self.codec = StateCodec(self.gw, self.gh)
+        self.heuristic = make_heuristic(heuristic, self.codec)
+        self.pathmax = not getattr(self.heuristic, "consistent", False)
+        self.max_states = max_states  # Plafond d'états en mémoire avant débordement sur disque
+        self.spill_dir = spill_dir
+        self.use_table = use_table  # Table de distances exactes (voir AStarSolver)
+        # Taille d'un état dans les fichiers de débordement (entier compact, petit-boutiste)
+        self.state_bytes = (self.codec.tile_count * self.codec.bits + 7) // 8
+        # Compteurs et rappels (voir AStarSolver) ; g_score_size est ici le nombre d'états en mémoire
+        self.stats = SearchStats(profile)
+        if progress_callback is not None:
+            self.stats.add_hook(progress_callback, progress_interval)
+
+    def add_hook(self, callback, every=1000):
+        """Enregistre callback(stats), appelé tous les 'every' nœuds développés."""
+        self.stats.add_hook(callback, every)
+
+    # --- Fichiers de débordement ---
+
+    def _write_run(self, states):
+        """Écrit une liste triée et sans doublon d'états dans un nouveau fichier et renvoie son chemin."""
+        path = os.path.join(self._directory, f"run{next(self._run_ids)}.bin")
+        size = self.state_bytes
+        with open(path, "wb") as f:
+            for i in range(0, len(states), CHUNK_STATES):
+                f.write(b"".join(state.to_bytes(size, "little") for state in states[i:i + CHUNK_STATES]))
+        self.spilled_states += len(states)
+        self.spilled_bytes += len(states) * size
+        self.spill_files += 1
+        return path
+
+    def _read_run(self, path):
+        """Relit un fichier de débordement, bloc par bloc."""
+        size = self.state_bytes
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(size * CHUNK_STATES)
+                if not data:
+                    return
+                for i in range(0, len(data), size):
+                    yield int.from_bytes(data[i:i + size], "little")
+
+    def _spill(self, bucket):
+        """Écrit le tampon d'un seau sur disque et libère la mémoire correspondante."""
+        self.in_memory -= len(bucket.buffer)
+        states = bucket.buffer if bucket.expanded else sorted(set(bucket.buffer))
+        bucket.buffer = []  # Nouvelle liste : un flux en cours sur l'ancienne reste valide
+        if states:
+            bucket.runs.append(self._write_run(states))
+
+    def _make_room(self):
+        """
+        Vide les plus gros tampons jusqu'à revenir sous la moitié du plafond. Le seau (g - 2, h) en
+        cours de lecture n'est pas vidé : son tampon resterait en mémoire, référencé par le flux.
+        """
+        for bucket in sorted(self.buckets.values(), key=lambda b: len(b.buffer), reverse=True):
+            if self.in_memory <= self.max_states // 2:
+                break
+            if bucket is not self._pinned:
+                self._spill(bucket)
+
+    def _stream(self, bucket):
+        """Contenu d'un seau, trié et sans doublon (fusion du tampon et des fichiers)."""
+        if not bucket.expanded:
+            bucket.buffer.sort()
+        return _unique(heapq.merge(bucket.buffer, *(self._read_run(path) for path in bucket.runs)))
+
+    def _contains(self, bucket, state):
+        """Indique si un seau développé contient 'state'."""
+        index = bisect.bisect_left(bucket.buffer, state)
+        if index < len(bucket.buffer) and bucket.buffer[index] == state:
+            return True
+        for path in bucket.runs:
+            for other in self._read_run(path):
+                if other >= state:
+                    if other == state:
+                        return True
+                    break
+        return False
+
+    # --- Recherche ---
+
+    def _add(self, g, h, state):
+        """Ajoute un état au seau (g, h), créé au besoin."""
+        bucket = self.buckets.get((g, h))
+        if bucket is None:
+            bucket = self.buckets[(g, h)] = _Bucket()
+            heapq.heappush(self.order, (g + h, g, h))
+        bucket.buffer.append(state)
+        bucket.size += 1
+        self.in_memory += 1
+        if self.in_memory > self.max_states:
+            self._make_room()
+        if self.in_memory > self.memory_peak:
+            self.memory_peak = self.in_memory
+
+    def _reconstruct(self, goal, depth):
+        """Remonte de l'objectif à la racine en cherchant, à chaque profondeur, le prédécesseur développé."""
+        codec, heuristic = self.codec, self.heuristic
+        chain = [goal]
+        state = goal
+        for g in range(depth - 1, -1, -1):
+            blank = codec.blank_index(state)
+            # Avec pathmax, le prédécesseur peut être rangé sous un h supérieur à heuristic(previous)
+            layer = sorted(h for bucket_g, h in self.buckets if bucket_g == g) if self.pathmax else None
+            for pos in codec.neighbors[blank]:
+                previous = codec.move(state, blank, pos)
+                h = heuristic(previous)
+                candidates = [self.buckets.get((g, h))] if layer is None else \
+                    [self.buckets[(g, other)] for other in layer if other >= h]
+                if any(bucket is not None and bucket.expanded and self._contains(bucket, previous)
+                       for bucket in candidates):
+                    state = previous
+                    break
+            else:
+                raise RuntimeError(f"Prédécesseur introuvable à la profondeur {g}")
+            chain.append(state)
+        chain.reverse()
+        return MoveSequence.from_blanks(self.gw, codec.blank_index(chain[0]),
+                                        [codec.blank_index(node) for node in chain[1:]])
+
+    def solve(self):
+        """
+        Exécute A* à mémoire plafonnée et renvoie le chemin le plus court (MoveSequence), ou None si
+        la configuration n'est pas résoluble. Les fichiers temporaires sont supprimés en fin de
+        recherche, y compris en cas d'interruption (SearchCancelled).
+        """
+        if not self.puzzle.is_solvable():
+            return None
+
+        codec = self.codec
+        start = codec.pack(self.puzzle.state)
+        target = codec.solved
+        stats = self.stats
+        stats.reset()
+        path = table_solution(self.puzzle, stats) if self.use_table else None
+        if path is not None:
+            return path
+        heuristic = stats.timed(self.heuristic)  # Chronométrée seulement en mode profilage
+        update, neighbors, tile_at, move = heuristic.update, codec.neighbors, codec.tile_at, codec.move
+        pathmax = self.pathmax
+
+        self.buckets = {}  # (g, h) -> _Bucket
+        self.order = []  # Tas des seaux à développer, par (f, g, h)
+        self.in_memory = 0  # États en mémoire, y compris le tampon du seau en cours de lecture
+        self.memory_peak = 0
+        self._pinned = None  # Seau (g - 2, h) en cours de lecture
+        self.spilled_states = self.spilled_bytes = self.spill_files = 0
+        self._run_ids = itertools.count()
+        expanded = generated = duplicates = 0
+        layer_f, layer_start = None, 0
+        next_hook = stats.next_hook()
+
+        def record(f):
+            stats.record(expanded, generated, duplicates, 0, self.memory_peak, self.in_memory, generated + 1, f,
+                         self.spilled_states, self.spilled_bytes, self.spill_files)
+
+        with tempfile.TemporaryDirectory(prefix="puzzle-spill-", dir=self.spill_dir,
+                                         ignore_cleanup_errors=True) as self._directory:
+            self._add(0, heuristic(start), start)
+            while self.order:
+                f, g, h = heapq.heappop(self.order)
+                bucket = self.buckets[(g, h)]
+                if f != layer_f:
+                    if layer_f is not None:
+                        stats.f_layers[layer_f] = expanded - layer_start
+                    layer_f, layer_start = f, expanded
+
+                # Les tampons lus pendant le développement restent comptés jusqu'à leur libération ;
+                # s'ils sont gros, ils sont d'abord écrits sur disque pour être lus en flux
+                previous = self.buckets.get((g - 2, h))
+                read_size = len(bucket.buffer) + (len(previous.buffer) if previous is not None else 0)
+                if read_size > self.max_states // 4:
+                    self._spill(bucket)
+                    if previous is not None:
+                        self._spill(previous)
+                self._pinned = previous
+
+                # Élimination différée des doublons : dans le seau lui-même, puis par rapport à (g - 2, h)
+                states = self._stream(bucket)
+                if previous is not None:
+                    states = _difference(states, self._stream(previous))
+                read_count, old_runs = len(bucket.buffer), bucket.runs
+                bucket.buffer, bucket.runs, bucket.expanded = [], [], True
+
+                kept = 0
+                for state in states:
+                    # Le contenu dédoublonné (trié) est conservé pour les seaux suivants et la reconstruction
+                    bucket.buffer.append(state)
+                    self.in_memory += 1
+                    kept += 1
+                    if self.in_memory > self.memory_peak:
+                        self.memory_peak = self.in_memory
+                    if state == target:
+                        stats.f_layers[layer_f] = expanded - layer_start
+                        record(f)
+                        return self._reconstruct(state, g)
+                    expanded += 1
+                    if expanded >= next_hook:
+                        record(f)
+                        next_hook = stats.fire(expanded)
+                    blank = codec.blank_index(state)
+                    for pos in neighbors[blank]:
+                        generated += 1
+                        child_h = update(state, h, tile_at(state, pos), pos, blank)
+                        if pathmax and child_h < h - 1:
+                            child_h = h - 1
+                        self._add(g + 1, child_h, move(state, blank, pos))
+                duplicates += bucket.size - kept
+                states = None  # Libère le flux, et avec lui l'ancien tampon du seau
+                self.in_memory -= read_count
+                self._pinned = None
+                for path in old_runs:
+                    os.remove(path)
+
+            if layer_f is not None:
+                stats.f_layers[layer_f] = expanded - layer_start
+            record(layer_f or 0)
+            return None
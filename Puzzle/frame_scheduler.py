@@ -0,0 +1,37 @@
+import pygame
+
+
+class FrameScheduler:
+    """
+    Cadence de la boucle de jeu selon ce qui se passe à l'écran :
+
+    * animation (tuiles qui bougent, lecture de la solution de l'IA) : 'fps' images par seconde ;
+    * travail en arrière-plan à suivre (recherche de l'IA) : un réveil tous les 'poll_interval' ms ;
+    * rien ne bouge (menu, pause, puzzle résolu) : la boucle dort jusqu'au prochain événement,
+      sans consommer de processeur.
+
+    L'événement qui réveille la boucle est conservé et rendu par events() à l'itération suivante.
+    """
+
+    def __init__(self, fps=60, poll_interval=100):
+        self.fps = fps
+        self.poll_interval = poll_interval
+        self.clock = pygame.time.Clock()
+        self._pending = []  # Événement reçu pendant l'attente, pas encore traité
+
+    def events(self):
+        """Renvoie les événements à traiter (y compris celui qui a réveillé la boucle)."""
+        events = self._pending + pygame.event.get()
+        self._pending = []
+        return events
+
+    def wait(self, animating=False, polling=False):
+        """Attend le moment de dessiner l'image suivante (fin d'itération de la boucle)."""
+        if animating:
+            self.clock.tick(self.fps)
+            return
+        # pygame.event.wait(0) attend sans limite de temps
+        event = pygame.event.wait(self.poll_interval if polling else 0)
+        if event.type != pygame.NOEVENT:
+            self._pending.append(event)
+        self.clock.tick()  # Le temps d'attente n'est pas compté dans la prochaine image
@@ -0,0 +1,203 @@
+KNOWN_STATES = 1 << 16  # États dont la base de motifs mémorise les index (mémoire vidée au-delà)
+
+
+class ManhattanHeuristic:
+    """
+    Distance de Manhattan totale : somme, pour chaque tuile, de la distance
+    entre sa position actuelle et sa position cible.
+    """
+
+    name = "manhattan"
+    consistent = True  # h ne varie que de 1 au plus par mouvement
+
+    def __init__(self, codec):
+        # Les états sont des entiers compacts (voir packed_state.StateCodec)
+        self.codec = codec
+        self.gw, self.gh = gw, gh = codec.gw, codec.gh
+        self.blank_value = codec.blank_value
+        tile_count = codec.tile_count
+        # Table des distances : manhattan[valeur][position], calculée une seule fois
+        self.manhattan = [
+            [abs(pos % gw - value % gw) + abs(pos // gw - value // gw) for pos in range(tile_count)]
+            for value in range(tile_count)
+        ]
+
+    def __call__(self, state):
+        """Évalue complètement l'heuristique pour un état (code entier)."""
+        return sum(self.manhattan[value][i] for i, value in enumerate(self.codec.unpack(state))
+                   if value != self.blank_value)
+
+    def update(self, state, h, tile, src, dst):
+        """
+        Met à jour h lorsque 'tile' glisse de 'src' vers la case vide 'dst'.
+        'state' est le code de l'état AVANT le mouvement.
+        """
+        return h - self.manhattan[tile][src] + self.manhattan[tile][dst]
+
+
+class LinearConflictHeuristic(ManhattanHeuristic):
+    """
+    Manhattan + conflits linéaires : deux tuiles dans leur ligne (ou colonne) cible
+    mais dans l'ordre inverse imposent au moins deux mouvements supplémentaires.
+    Pour chaque ligne, le nombre minimal de tuiles à sortir est
+    (tuiles concernées - plus longue sous-suite croissante).
+    """
+
+    name = "linear_conflict"
+
+    def __init__(self, codec):
+        super().__init__(codec)
+        gw, gh = self.gw, self.gh
+        self.rows = [[y * gw + x for x in range(gw)] for y in range(gh)]
+        self.cols = [[y * gw + x for y in range(gh)] for x in range(gw)]
+        self._cache = {}  # Nombre de conflits par suite de cibles (les lignes sont courtes)
+        # (ligne cible, position cible dans la ligne) de chaque valeur, pour les rangées et les colonnes
+        self._row_target = [(v // gw, v % gw) for v in range(self.codec.tile_count)]
+        self._col_target = [(v % gw, v // gw) for v in range(self.codec.tile_count)]
+        self._row_target[self.blank_value] = self._col_target[self.blank_value] = None
+
+    def _conflicts(self, targets):
+        """Nombre minimal de tuiles à retirer pour que 'targets' soit croissante."""
+        key = tuple(targets)
+        result = self._cache.get(key)
+        if result is None:
+            # Plus longue sous-suite croissante (quadratique, suffisant pour une ligne)
+            longest = [1] * len(key)
+            for i in range(len(key)):
+                for j in range(i):
+                    if key[j] < key[i] and longest[j] + 1 > longest[i]:
+                        longest[i] = longest[j] + 1
+            result = len(key) - max(longest, default=0)
+            self._cache[key] = result
+        return result
+
+    def _row_conflicts(self, values, y):
+        """Conflits de la rangée y, 'values' étant les valeurs de ses cases de gauche à droite."""
+        return self._conflicts([v % self.gw for v in values if v != self.blank_value and v // self.gw == y])
+
+    def _col_conflicts(self, values, x):
+        """Conflits de la colonne x, 'values' étant les valeurs de ses cases de haut en bas."""
+        return self._conflicts([v // self.gw for v in values if v != self.blank_value and v % self.gw == x])
+
+    def __call__(self, state):
+        h = super().__call__(state)
+        values = self.codec.unpack(state)
+        for y, row in enumerate(self.rows):
+            h += 2 * self._row_conflicts([values[p] for p in row], y)
+        for x, col in enumerate(self.cols):
+            h += 2 * self._col_conflicts([values[p] for p in col], x)
+        return h
+
+    def update(self, state, h, tile, src, dst):
+        h = super().update(state, h, tile, src, dst)
+        # Seule la ligne cible de la tuile déplacée peut changer de conflits, et seulement si la
+        # tuile y entre ou en sort : un mouvement horizontal change de colonne (la rangée garde ses
+        # tuiles, dans le même ordre), un mouvement vertical change de rangée.
+        gw = self.gw
+        if src // gw == dst // gw:
+            coord = tile % gw
+            if coord != src % gw and coord != dst % gw:
+                return h
+            line, target_of = self.cols[coord], self._col_target
+        else:
+            coord = tile // gw
+            if coord != src // gw and coord != dst // gw:
+                return h
+            line, target_of = self.rows[coord], self._row_target
+
+        # Cibles, dans l'ordre de la ligne, des tuiles qui y sont à leur place de ligne (avant et après)
+        tile_at, target = self.codec.tile_at, target_of[tile]
+        before, after = [], []
+        for p in line:
+            if p == src:
+                before.append(target)
+            elif p == dst:
+                after.append(target)
+            else:
+                value = target_of[tile_at(state, p)]
+                if value is not None and value[0] == coord:
+                    before.append(value)
+                    after.append(value)
+        return h + 2 * (self._conflicts([t for _, t in after]) - self._conflicts([t for _, t in before]))
+
+
+class PatternDatabaseHeuristic:
+    """
+    Heuristique par bases de motifs additives disjointes (voir pattern_db.py) :
+    somme des coûts exacts de chaque groupe de tuiles, lus dans des tables mmap.
+    """
+
+    name = "pdb"
+    # Admissible mais pas cohérente : chaque entrée est le minimum sur les régions de la case vide,
+    # h peut donc varier de plus de 1 en un mouvement (voir AStarSolver et AnytimeSolver)
+    consistent = False
+
+    def __init__(self, codec, database=None):
+        # Import local : le chargement n'a lieu que si cette heuristique est choisie. La base n'est
+        # jamais construite ici (plusieurs minutes, hors de portée des limites de temps des solveurs) :
+        # elle doit l'être au préalable (python pattern_db.py, ou le processus parent de batch_solve.py)
+        from pattern_db import load_pattern_database
+
+        self.codec = codec
+        self.gw, self.gh = codec.gw, codec.gh
+        self.blank_value = codec.blank_value
+        self.database = database if database is not None else load_pattern_database(self.gw, self.gh, build=False)
+        n = codec.tile_count
+
+        # Pour chaque valeur de tuile : son groupe et son poids n**i dans l'index du groupe
+        self.group_of = [None] * n
+        self.weight_of = [0] * n
+        for group, tiles in enumerate(self.database.partition):
+            for i, tile in enumerate(tiles):
+                self.group_of[tile] = group
+                self.weight_of[tile] = n ** i
+        self._known = {}  # État -> index de chaque groupe, pour les états produits par update
+        self.shifts = codec.shifts
+
+    def _indices(self, state):
+        """Index de configuration de chaque groupe pour un état."""
+        indices = [0] * len(self.database.partition)
+        for pos, value in enumerate(self.codec.unpack(state)):
+            group = self.group_of[value]
+            if group is not None:
+                indices[group] += pos * self.weight_of[value]
+        return indices
+
+    def __call__(self, state):
+        return sum(self.database.lookup(group, index) for group, index in enumerate(self._indices(state)))
+
+    def update(self, state, h, tile, src, dst):
+        # Les index de 'state' ont été mémorisés quand il a été produit par un appel précédent :
+        # l'index du groupe de la tuile déplacée change alors de (dst - src) * n**i, sans parcourir
+        # l'état. Seul un état absent (racine, ou mémoire vidée) est parcouru entièrement.
+        known = self._known
+        indices = known.get(state)
+        if indices is None:
+            indices = tuple(self._indices(state))
+        group = self.group_of[tile]
+        index = indices[group]
+        new_index = index + (dst - src) * self.weight_of[tile]
+        if len(known) >= KNOWN_STATES:
+            known.clear()
+        # Code de l'état suivant (voir StateCodec.move) : 'tile' passe de src à dst, la case vide de dst à src
+        delta = tile - self.blank_value
+        child = state + (delta << self.shifts[dst]) - (delta << self.shifts[src])
+        known[child] = indices[:group] + (new_index,) + indices[group + 1:]
+        return h - self.database.lookup(group, index) + self.database.lookup(group, new_index)
+
+
+# Heuristiques disponibles, sélectionnables par leur nom
+HEURISTICS = {
+    ManhattanHeuristic.name: ManhattanHeuristic,
+    LinearConflictHeuristic.name: LinearConflictHeuristic,
+    PatternDatabaseHeuristic.name: PatternDatabaseHeuristic,
+}
+
+
+def make_heuristic(heuristic, codec):
+    """Renvoie une instance d'heuristique à partir de son nom (ou l'instance fournie telle quelle)."""
+    if isinstance(heuristic, str):
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Heuristique inconnue : '{heuristic}' (choix : {', '.join(HEURISTICS)})")
+        return HEURISTICS[heuristic](codec)
+    return heuristic
@@ -0,0 +1,259 @@
+import time
+
+from board import Board
+from heuristics import make_heuristic
+from move_sequence import MoveSequence
+from packed_state import StateCodec
+from puzzle_astar import SearchCancelled
+from solution_cache import SolutionCache
+from solver_worker import SolverTask
+
+
+class HintEngine:
+    """
+    Indices pour le mode humain, « au mieux » : renvoie dans un budget de temps strict (50 ms par
+    défaut) le meilleur prochain mouvement connu, optimal seulement s'il est prouvé (exact=True),
+    en réutilisant le travail déjà fait :
+
+    * les solutions optimales connues (SolutionCache) : un état sur l'une d'elles, ou à un
+      ou deux mouvements d'elle, est résolu par simple consultation ;
+    * les bornes apprises par les recherches précédentes (self.learned) : chaque itération
+      IDA* terminée relève la borne inférieure de l'état et de ses voisins, qui sont
+      justement les états où se trouve le joueur au coup suivant ;
+    * une résolution « anytime » lancée en arrière-plan (SolverTask) : sa solution, d'abord
+      approchée puis améliorée, sert de route au joueur et de borne supérieure aux recherches ;
+      une fois prouvée optimale, elle rejoint le cache.
+
+    Si le budget expire avant la preuve d'optimalité, l'indice suit cette route, ou à défaut
+    le meilleur mouvement selon les bornes apprises (exact=False). Redemandé pour le même état,
+    un indice non prouvé est conservé, sauf si un mouvement prouvé ou une route plus courte est
+    apparu entre-temps : l'indice ne change pas d'avis sans raison.
+    La boucle de jeu appelle poll() à chaque image pour recevoir les routes de l'arrière-plan.
+    """
+
+    def __init__(self, grid_size, heuristic="linear_conflict", cache=None, time_budget=0.05,
+                 background_budget=0.2, background_max_states=1_000_000):
+        self.gw, self.gh = grid_size
+        self.codec = StateCodec(self.gw, self.gh)
+        self.heuristic = make_heuristic(heuristic, self.codec)
+        self.heuristic_name = heuristic if isinstance(heuristic, str) else "linear_conflict"
+        self.cache = cache if cache is not None else SolutionCache()
+        self.time_budget = time_budget
+        self.background_budget = background_budget  # Délai avant la première route (moteur 'anytime')
+        # Au-delà de ce nombre d'états mémorisés, la preuve d'optimalité est abandonnée (mémoire) ;
+        # le plafond est appliqué par le processus de résolution lui-même, même si poll() n'est plus appelé
+        self.background_max_states = background_max_states
+        self.learned = {}  # code -> borne inférieure prouvée de la distance à la solution
+        self._task = None  # Résolution en arrière-plan
+        self._task_state = None  # État résolu par cette tâche
+        self._route = []  # États de la meilleure solution connue de la tâche (codes, état de départ compris)
+        self._route_moves = None  # Cette solution (MoveSequence)
+        self._route_index = {}  # code -> position dans self._route
+        self._last = None  # Dernier indice : (code, position, exact, longueur de la route suivie)
+
+    def poll(self):
+        """Récupère sans bloquer les solutions de la résolution en arrière-plan."""
+        task = self._task
+        if task is None or not task.done():
+            return
+        if self._task_state is not None:
+            # Premier passage après le résultat
+            try:
+                self._set_route(self._task_state, task.result())
+            except RuntimeError:
+                self._task = self._task_state = None
+                return
+            self._task_state = None
+        improved = task.improvement()
+        if improved is not None:
+            self._set_route(self._route[0], improved)
+        if task.bound is not None and task.bound <= 1.0:
+            self.cache.store(self.gw, self.gh, self.codec.unpack(self._route[0]), self._route_moves)
+            task.cancel()
+            self._task = None
+        elif task.finished():
+            task.cancel()
+            self._task = None
+
+    def _set_route(self, start, path):
+        """Remplace la route suivie par les indices non prouvés."""
+        if path is None:
+            return
+        codec = self.codec
+        code = start if isinstance(start, int) else codec.pack(start)
+        blank = codec.blank_index(code)
+        self._route, self._route_moves = [code], path
+        for pos in path.blanks(blank):
+            self._route.append(codec.move(self._route[-1], blank, pos))
+            blank = pos
+        self._route_index = {code: i for i, code in enumerate(self._route)}
+
+    def cancel(self):
+        """Arrête la résolution en arrière-plan (retour au menu, fermeture du jeu)."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = self._task_state = None
+        self._route, self._route_moves, self._route_index = [], None, {}
+        self._last = None
+
+    def hint(self, state):
+        """
+        Renvoie (position, exact) : la position de la tuile à faire glisser dans la case vide,
+        et True si le mouvement est prouvé optimal. Renvoie None si l'état est résolu ou insoluble.
+        """
+        # La recherche s'arrête à 70 % du budget : le reste couvre le repli et le lancement en arrière-plan
+        deadline = time.perf_counter() + 0.7 * self.time_budget
+        self.poll()
+        codec = self.codec
+        code = codec.pack(state)
+        if code == codec.solved or not Board((self.gw, self.gh), state).is_solvable():
+            return None
+
+        pos, exact, length = self._compute(code, state, deadline)
+        last = self._last
+        if last is not None and last[0] == code and not exact and length >= last[3]:
+            return last[1], last[2]  # Rien de mieux depuis le dernier indice : il est conservé
+        self._last = (code, pos, exact, length)
+        return pos, exact
+
+    def _compute(self, code, state, deadline):
+        """Calcule un indice : (position, exact, longueur de la route suivie ou inf si aucune)."""
+        # 1. État sur une solution connue
+        path = self.cache.lookup(self.gw, self.gh, state)
+        if path is not None:
+            return self._first_move(code, path), True, len(path)
+
+        # 2. Meilleure solution connue (cache ou route) à deux mouvements au plus : borne supérieure
+        upper_path = self._nearby_solution(code)
+        upper = len(upper_path) if upper_path is not None else float("inf")
+
+        # 3. IDA* borné par le budget, qui démarre au-dessus des bornes déjà prouvées
+        try:
+            path = self._search(code, upper, deadline)
+        except SearchCancelled:
+            path = None
+        else:
+            if path is None:
+                path = upper_path  # Aucun chemin plus court que 'upper' : la solution voisine est optimale
+            self.cache.store(self.gw, self.gh, state, path)
+            return self._first_move(code, path), True, len(path)
+
+        # 4. Budget épuisé : suit la route connue, sinon lance une résolution en arrière-plan
+        if upper_path is not None:
+            return self._first_move(code, upper_path), False, upper
+        if self._task is None:
+            self._task_state = list(state)
+            self._task = SolverTask(Board((self.gw, self.gh), state), "anytime", self.heuristic_name,
+                                    time_budget=self.background_budget,
+                                    max_states=self.background_max_states)
+        return self._greedy_move(code), False, float("inf")
+
+    def _first_move(self, code, path):
+        """Position de la tuile déplacée par le premier mouvement d'un chemin depuis 'code'."""
+        return next(path.blanks(self.codec.blank_index(code)))
+
+    def _estimate(self, code):
+        """Borne inférieure de la distance : heuristique, relevée par les recherches précédentes."""
+        return max(self.heuristic(code), self.learned.get(code, 0))
+
+    def _known_path(self, code):
+        """Solution connue depuis 'code' : optimale (cache) ou suffixe de la route, sinon None."""
+        path = self.cache.lookup(self.gw, self.gh, self.codec.unpack(code))
+        if path is None and code in self._route_index:
+            path = self._route_moves[self._route_index[code]:]
+        return path
+
+    def _nearby_solution(self, code):
+        """Plus courte solution connue depuis 'code' ou un état à un ou deux mouvements, ou None."""
+        codec = self.codec
+        best = None
+        if code in self._route_index:
+            best = self._route_moves[self._route_index[code]:]
+        frontier = [(code, codec.blank_index(code), MoveSequence(self.gw))]
+        for _ in range(2):
+            next_frontier = []
+            for state, blank, prefix in frontier:
+                for pos in codec.neighbors[blank]:
+                    neighbor = codec.move(state, blank, pos)
+                    steps = prefix + MoveSequence.from_blanks(self.gw, blank, [pos])
+                    path = self._known_path(neighbor)
+                    if path is not None:
+                        if best is None or len(steps) + len(path) < len(best):
+                            best = steps + path
+                    else:
+                        next_frontier.append((neighbor, pos, steps))
+            frontier = next_frontier
+        return best
+
+    def _search(self, start, upper, deadline):
+        """
+        IDA* limité aux seuils inférieurs à 'upper'. Renvoie le chemin trouvé, ou None si aucune
+        solution n'est plus courte que 'upper'. Lève SearchCancelled une fois 'deadline' dépassée.
+        Après chaque itération complète, la borne prouvée de la racine et de ses voisins est
+        mémorisée dans self.learned.
+        """
+        codec = self.codec
+        heuristic, update, learned = self.heuristic, self.heuristic.update, self.learned
+        neighbors, tile_at, move = codec.neighbors, codec.tile_at, codec.move
+        moves = []
+        expanded = 0
+
+        def search(state, blank, prev_blank, g, h, bound):
+            f = g + max(h, learned.get(state, 0))
+            if f > bound:
+                return f
+            if h == 0:
+                return True
+            nonlocal expanded
+            expanded += 1
+            if expanded & 63 == 0 and time.perf_counter() > deadline:
+                raise SearchCancelled()
+            minimum = float('inf')
+            for neighbor in neighbors[blank]:
+                if neighbor == prev_blank:
+                    continue
+                new_h = update(state, h, tile_at(state, neighbor), neighbor, blank)
+                moves.append(neighbor)
+                result = search(move(state, blank, neighbor), neighbor, blank, g + 1, new_h, bound)
+                if result is True:
+                    return True
+                if result < minimum:
+                    minimum = result
+                moves.pop()
+            return minimum
+
+        start_blank = codec.blank_index(start)
+        start_h = heuristic(start)
+        bound = max(start_h, learned.get(start, 0))
+        while bound < upper:
+            # La racine est développée ici pour connaître le résultat de chaque voisin
+            children = []
+            for neighbor in neighbors[start_blank]:
+                child = move(start, start_blank, neighbor)
+                moves.append(neighbor)
+                result = search(child, neighbor, start_blank, 1,
+                                update(start, start_h, tile_at(start, neighbor), neighbor, start_blank), bound)
+                if result is True:
+                    return MoveSequence.from_blanks(self.gw, start_blank, moves)
+                moves.pop()
+                children.append((child, result))
+            bound = min(result for _, result in children)
+            learned[start] = bound
+            for child, result in children:
+                # Depuis un voisin, un chemin évite la racine (>= result - 1) ou la traverse (>= bound + 1)
+                if min(result - 1, bound + 1) > learned.get(child, 0):
+                    learned[child] = min(result - 1, bound + 1)
+        return None
+
+    def _greedy_move(self, code):
+        """
+        Mouvement vers le voisin de plus petite borne inférieure (style LRTA*), qui relève au passage
+        la borne de l'état courant : des indices répétés ne tournent pas en rond.
+        """
+        codec = self.codec
+        blank = codec.blank_index(code)
+        scored = [(1 + self._estimate(codec.move(code, blank, pos)), pos) for pos in codec.neighbors[blank]]
+        best, pos = min(scored)
+        if best > self.learned.get(code, 0):
+            self.learned[code] = best
+        return pos
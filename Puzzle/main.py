@@ -1,17 +1,69 @@
 import pygame
 import sys
 import pathlib
-import time
 import os
 
 # Import des classes depuis les autres fichiers
+from asset_pipeline import AssetPipeline, list_images
+from board import compute_grid_size
+from frame_scheduler import FrameScheduler
 from game_ui import Puzzle, BACKGROUND_COLOR, TEXT_COLOR, MARGIN
-from puzzle_astar import AStarSolver
+from hint import HintEngine
+from move_sequence import MoveSequence
+from solution_cache import CACHE_PATH, SolutionCache
+from solver_worker import SolverTask
 
 # --- Constantes ---
-FPS = 60  # Fréquence d'images par seconde
+FPS = 60  # Fréquence d'images par seconde pendant les animations (sinon, la boucle attend les événements)
+AI_MOVES_PER_SECOND = 5  # Vitesse de lecture de la solution de l'IA (touches + et - pour l'ajuster)
+AI_SPEED_LIMITS = (1, 60)  # Vitesses minimale et maximale, en mouvements par seconde
 BUTTON_COLOR = (80, 80, 80)  # Couleur des boutons dans le menu
 BUTTON_HOVER_COLOR = (110, 110, 110)  # Couleur des boutons au survol
+# Moteur de recherche de l'IA, parmi solver_worker.ENGINES : 'anytime', 'astar', 'idastar', 'parallel'
+# (exécuté dans un seul processus : le processus de résolution ne peut pas en créer d'autres) ou 'external'
+SOLVER_ENGINE = "anytime"
+SOLVER_HEURISTIC = "linear_conflict"  # Heuristique : 'manhattan', 'linear_conflict' ou 'pdb'
+AI_TIME_BUDGET = 0.5  # Délai (s) avant de jouer la meilleure solution connue (moteur 'anytime')
+HINT_TIME_BUDGET = 0.05  # Temps de réponse maximal (s) d'un indice en mode humain
+HINT_COLOR = (255, 200, 0)  # Contour de la tuile conseillée (indice exact)
+HINT_APPROX_COLOR = (255, 120, 0)  # Contour de la tuile conseillée (indice non prouvé optimal)
+# Difficultés du mélange (touche D du menu) : None pour un tirage uniforme, sinon une bande de scramble.py
+DIFFICULTY_LABELS = {None: "aléatoire", "easy": "facile", "medium": "moyenne", "hard": "difficile"}
+
+
+def compute_layout(img_w, img_h, base_tiles, info_panel_width):
+    """
+    Calcule la grille, la taille des tuiles et la taille de la fenêtre pour une image :
+    renvoie (grille, taille de tuile, (largeur, hauteur) de la zone de puzzle).
+    """
+    # Détermine les dimensions de la grille (largeur x hauteur) d'après les proportions de l'image
+    grid_width, grid_height = compute_grid_size(img_w, img_h, base_tiles)
+
+    # Calcule la taille des tuiles (en pixels) pour que le puzzle s'adapte
+    # à une taille de fenêtre maximale de 1200x900 (moins le panneau d'info).
+    tile_size = min((1200 - info_panel_width) // grid_width, 900 // grid_height)
+
+    # Calcule les dimensions totales de la zone de puzzle (grille + marges)
+    puzzle_width = grid_width * (tile_size + MARGIN) + MARGIN
+    puzzle_height = grid_height * (tile_size + MARGIN) + MARGIN
+    return (grid_width, grid_height), tile_size, (puzzle_width, puzzle_height)
+
+
+def reroute(start, played, remaining, new_path):
+    """
+    Raccorde une solution améliorée à l'animation en cours.
+    'start' est l'état initial, 'played' les mouvements déjà joués, 'remaining' le nombre de
+    mouvements restant à jouer et 'new_path' la nouvelle solution depuis l'état initial (MoveSequence).
+    Si l'état courant n'est pas sur la nouvelle solution, on revient sur ses pas jusqu'au dernier
+    état commun. Renvoie les mouvements qui restent à jouer, ou None s'ils ne sont pas moins nombreux.
+    """
+    position = {state: i for i, state in enumerate([tuple(start)] + list(new_path.states(start)))}
+    played_states = [tuple(start)] + list(played.states(start))
+    for back in range(len(played_states) - 1, -1, -1):
+        if played_states[back] in position:
+            candidate = played[back:].inverse() + new_path[position[played_states[back]]:]
+            break
+    return candidate if len(candidate) < remaining else None
 
 
 def main():
@@ -25,38 +77,17 @@ def main():
     INFO_PANEL_WIDTH = 250
 
     # --- CALCUL DYNAMIQUE DE LA TAILLE ---
-    try:
-        # Tente de charger l'image
-        img = pygame.image.load(IMAGE_PATH)
-        img_w, img_h = img.get_rect().size
-    except pygame.error:
+    # Les dimensions de l'image sont lues dans le cache des images (sans la décoder) si elle est connue
+    assets = AssetPipeline()
+    image_path, base_tiles = IMAGE_PATH, BASE_TILES  # Modifiables depuis le menu (touches I et 3 à 5)
+    img_size = assets.image_size(image_path)
+    if img_size is None:
         # En cas d'échec du chargement de l'image
-        print(f"INFO : Impossible de charger l'image '{IMAGE_PATH}'. La taille de la fenêtre sera par défaut.")
-        img_w, img_h = 400, 300  # Taille par défaut pour éviter une erreur
-
-    # Calcule le ratio Hauteur/Largeur de l'image
-    aspect_ratio = img_h / img_w
-
-    # Détermine les dimensions de la grille (GRID_WIDTH x GRID_HEIGHT)
-    # L'une des dimensions est fixée à BASE_TILES, l'autre est calculée
-    if img_w >= img_h:
-        # Image 'Paysage' ou Carrée (Largeur >= Hauteur)
-        GRID_WIDTH = BASE_TILES
-        GRID_HEIGHT = max(1, round(BASE_TILES * aspect_ratio))
-    else:
-        # Image 'Portrait' (Hauteur > Largeur)
-        GRID_HEIGHT = BASE_TILES
-        GRID_WIDTH = max(1, round(BASE_TILES / aspect_ratio))
-
-    GRID_SIZE = (GRID_WIDTH, GRID_HEIGHT)
-
-    # Calcule TILE_SIZE (taille des tuiles en pixels) pour que le puzzle s'adapte
-    # à une taille de fenêtre maximale de 1200x900 (moins le panneau d'info).
-    TILE_SIZE = min((1200 - INFO_PANEL_WIDTH) // GRID_WIDTH, 900 // GRID_HEIGHT)
+        print(f"INFO : Impossible de charger l'image '{image_path}'. La taille de la fenêtre sera par défaut.")
+        img_size = (400, 300)  # Taille par défaut pour éviter une erreur
 
-    # Calcule les dimensions totales de la zone de puzzle (grille + marges)
-    puzzle_width = GRID_WIDTH * (TILE_SIZE + MARGIN) + MARGIN
-    puzzle_height = GRID_HEIGHT * (TILE_SIZE + MARGIN) + MARGIN
+    GRID_SIZE, TILE_SIZE, (puzzle_width, puzzle_height) = compute_layout(*img_size, base_tiles, INFO_PANEL_WIDTH)
+    GRID_WIDTH, GRID_HEIGHT = GRID_SIZE
 
     # Définit la taille finale de la fenêtre (Puzzle + Panneau d'Info)
     SCREEN_WIDTH = puzzle_width + INFO_PANEL_WIDTH
@@ -67,24 +98,38 @@ def main():
     os.environ["SDL_VIDEO_CENTERED"] = "1"
     pygame.display.set_caption(f"{GRID_WIDTH}x{GRID_HEIGHT} Puzzle Game")
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    clock = pygame.time.Clock()  # Contrôle le framerate
+    scheduler = FrameScheduler(FPS)  # Contrôle le framerate (et dort quand rien ne bouge)
 
     # Initialise l'objet Puzzle avec les dimensions calculées
-    puzzle = Puzzle(GRID_SIZE, TILE_SIZE, screen, IMAGE_PATH)
+    puzzle = Puzzle(GRID_SIZE, TILE_SIZE, screen, image_path, assets)
+    # Solutions optimales déjà calculées (mémoire + disque) : une grille déjà vue est résolue sans recherche
+    solution_cache = SolutionCache(path=CACHE_PATH)
+    # Indices du mode humain : réutilisent le cache et les bornes des recherches précédentes
+    hint_engine = HintEngine(GRID_SIZE, SOLVER_HEURISTIC, solution_cache, HINT_TIME_BUDGET)
 
     # --- BOUCLE PRINCIPALE ---
     running = True
     player_mode = None  # Mode de jeu : None (Menu), 'human', ou 'ai'
-    ai_solution_path = []  # Liste des états à suivre pour l'animation de l'IA
+    ai_playback = None  # Lecture de la solution de l'IA : applique les mouvements un à un à puzzle.state
+    ai_remaining = 0  # Nombre de mouvements restant à jouer
     ai_animation_time = 0  # Timestamp pour contrôler la vitesse de l'animation de l'IA
+    ai_speed = AI_MOVES_PER_SECOND  # Mouvements par seconde de l'animation de l'IA
     ai_paused = False  # État de pause de l'animation de l'IA
+    solver_task = None  # Recherche de l'IA en cours dans un processus séparé (voir solver_worker.py)
+    ai_refiner = None  # Recherche 'anytime' qui continue d'améliorer la solution pendant l'animation
+    ai_start = None  # État initial de la solution jouée par l'IA
+    ai_played = None  # Mouvements déjà joués par l'IA (MoveSequence), pour raccorder une meilleure solution
+    hint = None  # Indice affiché : (état pour lequel il a été calculé, position de la tuile, exact)
+    difficulty = None  # Difficulté du mélange (voir DIFFICULTY_LABELS)
+    in_band = True  # False si le mélange n'a pas atteint la bande de difficulté demandée
 
     while running:
+        events = scheduler.events()
+        previous_mode = player_mode
+
         # --- MENU DE SÉLECTION ---
         if player_mode is None:
             screen.fill(BACKGROUND_COLOR)
-            font_title = pygame.font.Font(None, 50)
-            font_option = pygame.font.Font(None, 40)
 
             # Calcule le centre horizontal et vertical pour centrer le menu
             CENTER_X = SCREEN_WIDTH / 2
@@ -93,7 +138,7 @@ def main():
             SPACING = 70  # Espacement vertical entre les éléments du menu
 
             # Titre du jeu (ex: "15-Puzzle avec A*")
-            title_text = font_title.render(f"{GRID_WIDTH * GRID_HEIGHT - 1}-Puzzle avec A*", True, TEXT_COLOR)
+            title_text = puzzle.text(f"{GRID_WIDTH * GRID_HEIGHT - 1}-Puzzle avec A*", 50, TEXT_COLOR)
             # Positionne le titre au-dessus du centre
             title_rect = title_text.get_rect(center=(CENTER_X, CENTER_Y - SPACING))
             screen.blit(title_text, title_rect)
@@ -106,7 +151,7 @@ def main():
             # Change la couleur si la souris survole le bouton
             btn_color = BUTTON_HOVER_COLOR if human_btn.collidepoint(mouse_pos) else BUTTON_COLOR
             pygame.draw.rect(screen, btn_color, human_btn, border_radius=10)
-            human_text = font_option.render("Jouer (Humain)", True, TEXT_COLOR)
+            human_text = puzzle.text("Jouer (Humain)", 40, TEXT_COLOR)
             screen.blit(human_text, human_text.get_rect(center=human_btn.center))
 
             # Bouton Résoudre (IA)
@@ -115,86 +160,238 @@ def main():
 
             btn_color = BUTTON_HOVER_COLOR if ai_btn.collidepoint(mouse_pos) else BUTTON_COLOR
             pygame.draw.rect(screen, btn_color, ai_btn, border_radius=10)
-            ai_text = font_option.render("Résoudre (IA)", True, TEXT_COLOR)
+            ai_text = puzzle.text("Résoudre (IA)", 40, TEXT_COLOR)
             screen.blit(ai_text, ai_text.get_rect(center=ai_btn.center))
 
-            for event in pygame.event.get():
+            # Choix de l'image et de la taille de la grille (sans recharger le jeu)
+            options_text = puzzle.text("I : image suivante   3 / 4 / 5 : taille de la grille", 24, TEXT_COLOR)
+            screen.blit(options_text, options_text.get_rect(center=(CENTER_X, CENTER_Y + 2 * SPACING)))
+            difficulty_text = puzzle.text(f"D : difficulté ({DIFFICULTY_LABELS[difficulty]})", 24, TEXT_COLOR)
+            screen.blit(difficulty_text, difficulty_text.get_rect(center=(CENTER_X, CENTER_Y + 2 * SPACING + 30)))
+
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if human_btn.collidepoint(event.pos):
                         player_mode = 'human'
-                        puzzle.shuffle()  # Commence en mode Humain, mélange le puzzle
+                        in_band = puzzle.shuffle(difficulty)  # Commence en mode Humain, mélange le puzzle
                     elif ai_btn.collidepoint(event.pos):
                         player_mode = 'ai'
-                        puzzle.shuffle()  # Commence en mode IA, mélange le puzzle
-                        solver = AStarSolver(puzzle)
+                        in_band = puzzle.shuffle(difficulty)  # Commence en mode IA, mélange le puzzle
 
                         print("--- DÉBOGAGE ---")
                         print(f"Configuration à résoudre: {puzzle.state}")
                         # Vérifie si l'état initial est solvable
                         print(f"Est-ce résoluble ? : {puzzle.is_solvable()}")
 
-                        start_time = time.time()
-                        solution = solver.solve()  # Exécute l'algorithme A*
-                        print(f"Temps de recherche IA: {time.time() - start_time:.4f} secondes.")
-
-                        if solution:
-                            print(f"Solution trouvée en {len(solution)} mouvements.")
-                            # Le chemin de solution est stocké SANS l'état initial
-                            ai_solution_path = solution
-                            # Le compteur de mouvements est réinitialisé pour l'animation
-                            puzzle.moves = 0
+                        cached = solution_cache.lookup(GRID_WIDTH, GRID_HEIGHT, puzzle.state)
+                        if cached is not None:
+                            print(f"Solution trouvée dans le cache en {len(cached)} mouvements.")
+                            ai_start, ai_played = tuple(puzzle.state), MoveSequence(GRID_WIDTH)
+                            ai_playback, ai_remaining = cached.play(puzzle.state), len(cached)
                             ai_animation_time = pygame.time.get_ticks()
                         else:
-                            print("ERREUR: L'IA n'a pas trouvé de solution.")
-                            player_mode = None  # Retourne au menu en cas d'échec
+                            # Lance la recherche dans un processus séparé : la fenêtre reste réactive
+                            solver_task = SolverTask(puzzle, SOLVER_ENGINE, SOLVER_HEURISTIC,
+                                                     time_budget=AI_TIME_BUDGET)
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_d:
+                    # Difficulté suivante : aléatoire -> facile -> moyenne -> difficile -> aléatoire
+                    levels = list(DIFFICULTY_LABELS)
+                    difficulty = levels[(levels.index(difficulty) + 1) % len(levels)]
+                if event.type == pygame.KEYDOWN and event.key in (pygame.K_i, pygame.K_3, pygame.K_4, pygame.K_5):
+                    if event.key == pygame.K_i:
+                        # Image suivante du dossier des images
+                        images = list_images(IMAGE_PATH.parent)
+                        if not images:
+                            continue
+                        image_path = images[(images.index(image_path) + 1) % len(images)] \
+                            if image_path in images else images[0]
+                    else:
+                        base_tiles = event.key - pygame.K_0
+                    img_size = assets.image_size(image_path) or (400, 300)
+                    new_grid, TILE_SIZE, (puzzle_width, puzzle_height) = compute_layout(
+                        *img_size, base_tiles, INFO_PANEL_WIDTH)
+                    if (puzzle_width + INFO_PANEL_WIDTH, puzzle_height) != (SCREEN_WIDTH, SCREEN_HEIGHT):
+                        SCREEN_WIDTH, SCREEN_HEIGHT = puzzle_width + INFO_PANEL_WIDTH, puzzle_height
+                        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+                    if new_grid != GRID_SIZE:
+                        GRID_SIZE = new_grid
+                        GRID_WIDTH, GRID_HEIGHT = GRID_SIZE
+                        hint_engine.cancel()
+                        hint_engine = HintEngine(GRID_SIZE, SOLVER_HEURISTIC, solution_cache, HINT_TIME_BUDGET)
+                    pygame.display.set_caption(f"{GRID_WIDTH}x{GRID_HEIGHT} Puzzle Game")
+                    # Seules les tuiles sont reconstruites : l'image décodée et l'atlas sont en cache
+                    puzzle.set_image(image_path, GRID_SIZE, TILE_SIZE, screen)
 
             pygame.display.flip()  # Met à jour tout l'écran pour le menu
+            puzzle.invalidate()  # Le menu recouvre la grille : elle sera entièrement redessinée
+            # Le menu ne change qu'avec un événement (survol, clic) : attente sans consommer de processeur,
+            # sauf s'il faut quitter ou afficher aussitôt le mode choisi
+            scheduler.wait(animating=not running or player_mode != previous_mode)
             continue  # Passe directement à la prochaine itération de la boucle
 
         # --- GESTION DES ÉVÉNEMENTS DU JEU ---
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                puzzle.invalidate()  # Fenêtre découverte : tout redessiner
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:  # Touche ECHAP
+                    if solver_task is not None:
+                        solver_task.cancel()  # Interrompt la recherche de l'IA en cours
+                        solver_task = None
+                        print("Recherche IA annulée.")
+                    if ai_refiner is not None:
+                        ai_refiner.cancel()
+                        ai_refiner = None
+                    hint_engine.cancel()
+                    hint = None
                     player_mode = None  # Retour au menu
-                    ai_solution_path.clear()
+                    ai_playback, ai_remaining = None, 0
                     ai_paused = False
                 # Touche ESPACE pour la pause/reprise de l'animation de l'IA
                 if player_mode == 'ai' and event.key == pygame.K_SPACE:
                     ai_paused = not ai_paused
+                # Touches + et - : vitesse de l'animation de l'IA
+                if player_mode == 'ai' and event.key in (pygame.K_PLUS, pygame.K_KP_PLUS, pygame.K_EQUALS):
+                    ai_speed = min(AI_SPEED_LIMITS[1], ai_speed * 2)
+                if player_mode == 'ai' and event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    ai_speed = max(AI_SPEED_LIMITS[0], ai_speed // 2)
+                # Touche H : indice (meilleur prochain mouvement connu) en mode humain
+                if player_mode == 'human' and event.key == pygame.K_h:
+                    start = pygame.time.get_ticks()
+                    result = hint_engine.hint(puzzle.state)
+                    if result is not None:
+                        hint = (list(puzzle.state),) + result
+                        print(f"Indice en {pygame.time.get_ticks() - start} ms"
+                              f"{'' if result[1] else ' (non prouvé optimal)'}.")
             if event.type == pygame.MOUSEBUTTONDOWN and player_mode == 'human':
                 puzzle.handle_click(event.pos)  # Gère le clic de la souris pour les humains
 
         # --- LOGIQUE DU JEU ---
+        # Routes de la résolution en arrière-plan des indices : reçues à chaque image, pas seulement
+        # à la prochaine demande (sans quoi la tâche resterait active après avoir fini son travail)
+        if player_mode == 'human':
+            hint_engine.poll()
+
+        # Récupère le résultat de la recherche de l'IA dès qu'il est disponible
+        if player_mode == 'ai' and solver_task is not None and solver_task.done():
+            try:
+                solution = solver_task.result()
+            except RuntimeError as error:
+                print(f"ERREUR: La recherche de l'IA a échoué ({error}).")
+                solution = None
+            else:
+                print(f"Temps de recherche IA: {solver_task.search_time:.4f} secondes.")
+                if not solver_task.finished():
+                    ai_refiner = solver_task  # La recherche continue d'améliorer la solution
+            bound = solver_task.bound
+            solver_task = None
+
+            if solution:
+                print(f"Solution trouvée en {len(solution)} mouvements (borne {bound:.2f}).")
+                if bound <= 1.0:
+                    solution_cache.store(GRID_WIDTH, GRID_HEIGHT, puzzle.state, solution)
+                # La solution est jouée mouvement par mouvement, directement sur puzzle.state
+                ai_start, ai_played = tuple(puzzle.state), MoveSequence(GRID_WIDTH)
+                ai_playback, ai_remaining = solution.play(puzzle.state), len(solution)
+                # Le compteur de mouvements est réinitialisé pour l'animation
+                puzzle.moves = 0
+                ai_animation_time = pygame.time.get_ticks()
+            else:
+                print("ERREUR: L'IA n'a pas trouvé de solution.")
+                player_mode = None  # Retourne au menu en cas d'échec
+
+        # Solution améliorée par la recherche 'anytime' : on bascule dessus si elle raccourcit le reste
+        if ai_refiner is not None:
+            refiner_finished = ai_refiner.finished()
+            improved = ai_refiner.improvement()
+            if improved is not None and ai_refiner.bound <= 1.0:
+                solution_cache.store(GRID_WIDTH, GRID_HEIGHT, ai_start, improved)
+            if improved is not None and ai_remaining:
+                shorter = reroute(ai_start, ai_played, ai_remaining, improved)
+                if shorter is not None:
+                    print(f"Solution améliorée : {len(improved)} mouvements (borne {ai_refiner.bound:.2f}).")
+                    ai_playback, ai_remaining = shorter.play(puzzle.state), len(shorter)
+            if refiner_finished or not ai_remaining:
+                ai_refiner.cancel()  # Optimalité prouvée ou animation terminée : arrête la recherche
+                ai_refiner = None
+
         # Avancement de l'animation de l'IA
-        if player_mode == 'ai' and ai_solution_path and not ai_paused:
+        if player_mode == 'ai' and ai_remaining and not ai_paused:
             now = pygame.time.get_ticks()
-            # Contrôle la vitesse (un mouvement toutes les 200 ms)
-            if now - ai_animation_time > 200:
+            # Contrôle la vitesse (ai_speed mouvements par seconde)
+            if now - ai_animation_time >= 1000 / ai_speed:
                 ai_animation_time = now
-                current_state = ai_solution_path.pop(0)  # Prend le prochain état du chemin
-                puzzle.state = list(current_state)  # Applique le nouvel état au puzzle
+                ai_played.append(next(ai_playback))  # Joue le mouvement suivant sur puzzle.state (en place)
+                ai_remaining -= 1
                 puzzle.moves += 1  # Incrémente le compteur de mouvements
 
         # --- DESSIN ---
-        screen.fill(BACKGROUND_COLOR)
-        puzzle.draw()  # Dessine la grille de tuiles ou l'image complète (si gagné)
+        # Textes supplémentaires du panneau : (texte, taille, couleur, position)
+        overlay = []
+        info_panel_x = puzzle_width + 20
+
+        # Afficher la progression de la recherche de l'IA tant qu'elle est en cours
+        if player_mode == 'ai' and solver_task is not None:
+            progress = solver_task.progress or {"nodes_expanded": 0, "f_bound": 0}
+            lines = [
+                "Recherche IA en cours...",
+                f"Nœuds : {progress['nodes_expanded']}",
+                f"Borne f : {progress['f_bound']}",
+                f"Temps : {solver_task.elapsed():.1f} s",
+                "Echap : annuler",
+            ]
+            for i, line in enumerate(lines):
+                overlay.append((line, 28, (255, 200, 0), (info_panel_x, SCREEN_HEIGHT - 30 * (len(lines) - i) - 20)))
+
+        # Afficher la borne de sous-optimalité de la solution jouée tant qu'elle peut s'améliorer
+        if player_mode == 'ai' and ai_refiner is not None:
+            overlay.append((f"Optimale à x{ai_refiner.bound:.2f} près", 28, (255, 200, 0),
+                            (info_panel_x, SCREEN_HEIGHT - 100)))
+
+        if player_mode == 'ai' and ai_remaining:
+            overlay.append((f"Vitesse : {ai_speed} coups/s", 28, TEXT_COLOR, (info_panel_x, 260)))
+
+        # Signaler un mélange resté hors de la bande de difficulté demandée
+        if player_mode is not None and not in_band:
+            overlay.append((f"Difficulté approchée ({DIFFICULTY_LABELS[difficulty]})", 24, HINT_APPROX_COLOR,
+                            (info_panel_x, 300)))
 
         # Afficher le message de pause si l'IA est en pause
         if player_mode == 'ai' and ai_paused:
-            font_pause = pygame.font.Font(None, 40)
-            pause_text = font_pause.render("PAUSE", True, (255, 200, 0))
-            info_panel_x = puzzle_width + 20
-            text_rect = pause_text.get_rect(left=info_panel_x, bottom=SCREEN_HEIGHT - 20)
-            screen.blit(pause_text, text_rect)
-
-        pygame.display.flip()  # Met à jour tout l'écran pour le jeu
-
-        clock.tick(FPS)  # Limite la boucle à 60 images par seconde
-
+            pause_height = puzzle.text("PAUSE", 40, (255, 200, 0)).get_height()
+            overlay.append(("PAUSE", 40, (255, 200, 0), (info_panel_x, SCREEN_HEIGHT - 20 - pause_height)))
+
+        # Entoure la tuile conseillée tant que le joueur n'a pas joué
+        highlight = None
+        if hint is not None:
+            if player_mode == 'human' and hint[0] == puzzle.state:
+                highlight = (hint[1], HINT_COLOR if hint[2] else HINT_APPROX_COLOR)
+            else:
+                hint = None
+
+        puzzle.player_mode = player_mode  # Contrôles affichés selon le mode de jeu
+        # Dessine la grille de tuiles (ou l'image complète si gagné) : seules les zones modifiées
+        # depuis l'image précédente sont redessinées puis envoyées à l'écran
+        dirty_rects = puzzle.draw(overlay, highlight)
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+
+        # 60 images par seconde pendant l'animation de l'IA, un réveil régulier pendant une recherche
+        # (affichage de la progression), sinon attente du prochain événement (clic, touche)
+        animating = bool(ai_remaining and not ai_paused)
+        scheduler.wait(animating=animating or not running or player_mode != previous_mode,
+                       polling=solver_task is not None or ai_refiner is not None)
+
+    # Arrête les recherches encore en cours avant de quitter
+    for task in (solver_task, ai_refiner):
+        if task is not None:
+            task.cancel()
+    hint_engine.cancel()
+    solution_cache.close()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,132 @@
+LETTERS = "UDLR"  # Déplacements de la case vide : haut, bas, gauche, droite (codes 0 à 3)
+# Lettre de chaque déplacement de la case vide -> décalage (dx, dy) de sa position
+DIRECTIONS = {"U": (0, -1), "D": (0, 1), "L": (-1, 0), "R": (1, 0)}
+OPPOSITE = {"U": "D", "D": "U", "L": "R", "R": "L"}
+
+
+class MoveSequence:
+    """
+    Solution compacte : suite des déplacements de la case vide (U, D, L, R), 2 bits par mouvement.
+
+    Une solution de n mouvements occupe n / 4 octets, quelle que soit la taille de la grille,
+    au lieu de n états complets. Les états ne sont reconstruits qu'à la demande (states, play),
+    et to_bytes / from_bytes donnent une sérialisation directe (cache disque, échanges entre
+    processus). La largeur de la grille 'gw' sert à convertir les lettres en positions.
+    """
+
+    __slots__ = ("gw", "_data", "_length")
+
+    def __init__(self, gw, moves=""):
+        self.gw = gw
+        self._data = bytearray()
+        self._length = 0
+        for letter in moves:
+            self.append(letter)
+
+    @classmethod
+    def from_blanks(cls, gw, start_blank, blanks):
+        """Construit la suite à partir des positions successives de la case vide (départ exclu)."""
+        letters = {dy * gw + dx: letter for letter, (dx, dy) in DIRECTIONS.items()}
+        sequence = cls(gw)
+        for blank in blanks:
+            letter = letters.get(blank - start_blank)
+            # Un décalage de ±1 doit rester sur la même rangée
+            if letter is None or (letter in "LR" and blank // gw != start_blank // gw):
+                raise ValueError(f"Mouvement impossible de la case {start_blank} à la case {blank}")
+            sequence.append(letter)
+            start_blank = blank
+        return sequence
+
+    @classmethod
+    def from_path(cls, gw, state, path):
+        """Construit la suite à partir d'un chemin d'états (sans l'état initial)."""
+        blank_value = len(state) - 1
+        return cls.from_blanks(gw, list(state).index(blank_value), (list(s).index(blank_value) for s in path))
+
+    @classmethod
+    def from_bytes(cls, gw, data):
+        """Relit une suite écrite par to_bytes."""
+        sequence = cls(gw)
+        sequence._data = bytearray(data[1:])
+        sequence._length = len(sequence._data) * 4 - data[0]
+        return sequence
+
+    def to_bytes(self):
+        """Octet de remplissage (nombre de codes inutilisés du dernier octet), puis 4 mouvements par octet."""
+        return bytes([-self._length % 4]) + bytes(self._data)
+
+    def __reduce__(self):
+        # Sérialisation (pickle) sous forme compacte
+        return MoveSequence.from_bytes, (self.gw, self.to_bytes())
+
+    def append(self, letter):
+        """Ajoute un mouvement en fin de suite."""
+        index = self._length
+        if index % 4 == 0:
+            self._data.append(0)
+        self._data[index >> 2] |= LETTERS.index(letter) << ((index & 3) * 2)
+        self._length += 1
+
+    def _code(self, index):
+        return (self._data[index >> 2] >> ((index & 3) * 2)) & 3
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield LETTERS[self._code(index)]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return MoveSequence(self.gw, (LETTERS[self._code(i)] for i in range(self._length)[key]))
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("Indice de mouvement hors limites")
+        return LETTERS[self._code(key)]
+
+    def __add__(self, other):
+        sequence = self[:]
+        for letter in other:
+            sequence.append(letter)
+        return sequence
+
+    def __eq__(self, other):
+        if not isinstance(other, MoveSequence):
+            return NotImplemented
+        return (self.gw, self._length, self._data) == (other.gw, other._length, other._data)
+
+    def __str__(self):
+        return "".join(self)
+
+    def __repr__(self):
+        return f"MoveSequence({self.gw}, {str(self)!r})"
+
+    def inverse(self):
+        """Suite qui annule celle-ci (mouvements opposés, dans l'ordre inverse)."""
+        return MoveSequence(self.gw, (OPPOSITE[letter] for letter in reversed(str(self))))
+
+    def blanks(self, start_blank):
+        """Génère les positions successives de la case vide, à partir de 'start_blank' (exclue)."""
+        offsets = {letter: dy * self.gw + dx for letter, (dx, dy) in DIRECTIONS.items()}
+        for letter in self:
+            start_blank += offsets[letter]
+            yield start_blank
+
+    def states(self, state):
+        """Génère les états successifs (tuples) à partir de 'state' (exclu), comme les anciens chemins."""
+        state = list(state)
+        for _ in self.play(state):
+            yield tuple(state)
+
+    def play(self, state):
+        """
+        Applique les mouvements un à un à la liste 'state', modifiée en place : chaque pas du
+        générateur joue un mouvement et renvoie sa lettre.
+        """
+        blank = state.index(len(state) - 1)
+        for letter, pos in zip(self, self.blanks(blank)):
+            state[blank], state[pos] = state[pos], state[blank]
+            blank = pos
+            yield letter
@@ -0,0 +1,62 @@
+class StateCodec:
+    """
+    Encode un état du puzzle (liste position -> valeur) en un seul entier :
+    la valeur de la position i occupe les bits [i * bits, (i + 1) * bits).
+    4 bits par tuile jusqu'à 16 cases (un 15-puzzle tient dans 64 bits), davantage au-delà.
+
+    Un entier Python est haché en O(1) et occupe bien moins de mémoire qu'un tuple,
+    ce qui réduit le coût des dictionnaires et de la file de priorité du solveur.
+    La conversion depuis/vers Puzzle.state ne se fait qu'aux extrémités de la recherche.
+    """
+
+    def __init__(self, gw, gh):
+        self.gw, self.gh = gw, gh
+        self.tile_count = gw * gh
+        self.blank_value = self.tile_count - 1
+        # Nombre de bits par case : 4 jusqu'à 16 cases, sinon le minimum nécessaire
+        self.bits = max(4, (self.tile_count - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        # Décalage binaire de chaque position
+        self.shifts = [pos * self.bits for pos in range(self.tile_count)]
+
+        # Voisins de chaque position (positions atteignables par la case vide)
+        self.neighbors = []
+        for pos in range(self.tile_count):
+            b_x, b_y = pos % gw, pos // gw
+            self.neighbors.append([
+                (b_y + dy) * gw + (b_x + dx)
+                for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]
+                if 0 <= b_x + dx < gw and 0 <= b_y + dy < gh
+            ])
+
+        self.solved = self.pack(range(self.tile_count))  # Code de l'état résolu
+
+    def pack(self, state):
+        """Convertit une séquence de valeurs en entier."""
+        code = 0
+        for shift, value in zip(self.shifts, state):
+            code |= value << shift
+        return code
+
+    def unpack(self, code):
+        """Convertit un entier en tuple de valeurs (hachable, comme les anciens états)."""
+        return tuple((code >> shift) & self.mask for shift in self.shifts)
+
+    def tile_at(self, code, pos):
+        """Valeur de la case 'pos'."""
+        return (code >> self.shifts[pos]) & self.mask
+
+    def blank_index(self, code):
+        """Position de la case vide (parcours complet : à n'utiliser qu'aux extrémités)."""
+        for pos, shift in enumerate(self.shifts):
+            if (code >> shift) & self.mask == self.blank_value:
+                return pos
+        raise ValueError("État sans case vide")
+
+    def move(self, code, blank, pos):
+        """
+        Fait glisser la tuile de 'pos' dans la case vide 'blank' et renvoie le nouveau code.
+        Deux additions suffisent : la case vide reçoit la tuile, 'pos' reçoit la case vide.
+        """
+        delta = ((code >> self.shifts[pos]) & self.mask) - self.blank_value
+        return code + (delta << self.shifts[blank]) - (delta << self.shifts[pos])
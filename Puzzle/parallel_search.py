@@ -0,0 +1,259 @@
+import collections
+import multiprocessing
+import os
+import queue
+
+from distance_table import table_solution
+from heuristics import make_heuristic
+from move_sequence import MoveSequence
+from packed_state import StateCodec
+from search_stats import SearchStats
+
+TASKS_PER_WORKER = 16  # Sous-arbres par processus et par itération : de quoi équilibrer la charge
+SUBTREE_NODES = 100_000  # Nœuds développés par sous-arbre avant d'en rendre les branches restantes
+
+_subtree_search = None  # Recherche du processus courant du pool (voir _init_worker)
+
+
+class _SubtreeSearch:
+    """Recherche en profondeur bornée (itération IDA*) d'un sous-arbre, exécutée dans un processus du pool."""
+
+    def __init__(self, gw, gh, heuristic, stop_event, subtree_nodes=SUBTREE_NODES):
+        self.gw = gw
+        self.codec = StateCodec(gw, gh)
+        self.heuristic = make_heuristic(heuristic, self.codec)
+        self.stop_event = stop_event  # Levé par le processus principal dès qu'une solution est trouvée
+        self.subtree_nodes = subtree_nodes
+
+    def __call__(self, task):
+        """
+        Explore le sous-arbre de 'task' sous le seuil 'bound'. Renvoie (identifiant, résultat, suite
+        des positions de la case vide jusqu'au but ou None, nœuds développés, nœuds générés,
+        branches rendues), où le résultat vaut True (but atteint), le plus petit f ayant dépassé le
+        seuil, ou None (recherche interrompue).
+
+        Au-delà de 'subtree_nodes' nœuds développés, les branches non encore explorées de la pile
+        ne sont plus parcourues mais rendues au processus principal, qui les redistribue : un gros
+        sous-arbre est ainsi redécoupé au lieu d'occuper un seul processus jusqu'à la fin de
+        l'itération. Chaque branche rendue est (positions de la case vide depuis la racine du
+        sous-arbre, état, case vide, case vide précédente, g, h).
+        """
+        task_id, state, blank, prev_blank, g, h, bound = task
+        codec, stop_event, budget = self.codec, self.stop_event, self.subtree_nodes
+        update, neighbors, tile_at, move = self.heuristic.update, codec.neighbors, codec.tile_at, codec.move
+        moves = []
+        donated = []
+        expanded = generated = 0
+
+        class Stopped(Exception):
+            pass
+
+        def search(state, blank, prev_blank, g, h):
+            f = g + h
+            if f > bound:
+                return f
+            if h == 0:
+                return True
+            nonlocal expanded, generated
+            expanded += 1
+            if expanded & 1023 == 0 and stop_event.is_set():
+                raise Stopped()
+            minimum = float('inf')
+            for neighbor in neighbors[blank]:
+                if neighbor == prev_blank:
+                    continue
+                new_h = update(state, h, tile_at(state, neighbor), neighbor, blank)
+                generated += 1
+                if expanded > budget:
+                    # Budget épuisé : la branche est rendue (ou écartée si elle dépasse déjà le seuil)
+                    if g + 1 + new_h > bound:
+                        minimum = min(minimum, g + 1 + new_h)
+                    else:
+                        donated.append((moves + [neighbor], move(state, blank, neighbor), neighbor, blank,
+                                        g + 1, new_h))
+                    continue
+                moves.append(neighbor)
+                result = search(move(state, blank, neighbor), neighbor, blank, g + 1, new_h)
+                if result is True:
+                    return True
+                if result < minimum:
+                    minimum = result
+                moves.pop()
+            return minimum
+
+        try:
+            result = search(state, blank, prev_blank, g, h)
+        except Stopped:
+            return task_id, None, None, expanded, generated, []
+        if result is True:
+            return task_id, True, moves, expanded, generated, []
+        return task_id, result, None, expanded, generated, donated
+
+
+def _init_worker(gw, gh, heuristic, stop_event, subtree_nodes=SUBTREE_NODES):
+    """Initialise un processus du pool : codec et heuristique construits une seule fois."""
+    global _subtree_search
+    _subtree_search = _SubtreeSearch(gw, gh, heuristic, stop_event, subtree_nodes)
+
+
+def _run_subtree(task):
+    return _subtree_search(task)
+
+
+class ParallelIDAStarSolver:
+    """
+    IDA* parallèle, avec la même interface que IDAStarSolver (plus le nombre de processus 'workers').
+
+    À chaque itération (seuil f), le processus principal développe l'arbre en largeur depuis la
+    racine jusqu'à obtenir assez de sous-arbres (TASKS_PER_WORKER par processus), puis les confie
+    à un pool de processus. Les sous-arbres sont distribués un par un à mesure que les processus se
+    libèrent ; un sous-arbre qui dépasse 'subtree_nodes' nœuds développés rend ses branches
+    restantes, remises en file pour les processus libres (redécoupage dynamique : la taille très
+    inégale des sous-arbres ne laisse pas les autres processus inactifs en fin d'itération).
+    Chaque itération ne trouve que des chemins de coût égal au seuil, et les seuils précédents
+    n'en contenaient aucun : la première solution trouvée est optimale, et les autres processus
+    sont alors arrêtés.
+
+    Un processus « démon » (pool de processus, par exemple) ne peut pas créer de processus : la
+    recherche s'exécute alors dans le processus courant, comme avec workers=1. SolverTask et
+    batch_solve.py lancent donc ce moteur hors d'un processus démon.
+    """
+
+    def __init__(self, puzzle_instance, heuristic="manhattan", progress_callback=None, progress_interval=1000,
+                 profile=False, workers=None, subtree_nodes=SUBTREE_NODES, use_table=True):
+        self.puzzle = puzzle_instance
+        self.gw, self.gh = puzzle_instance.gs
+        self.codec = StateCodec(self.gw, self.gh)
+        self.heuristic_name = heuristic
+        self.heuristic = make_heuristic(heuristic, self.codec)
+        self.workers = workers or os.cpu_count() or 1  # Nombre de processus de recherche
+        self.subtree_nodes = subtree_nodes  # Budget d'un sous-arbre avant redécoupage
+        self.use_table = use_table  # Table de distances exactes (voir AStarSolver)
+        # Compteurs et rappels (voir IDAStarSolver) ; les rappels sont déclenchés dans le processus
+        # principal, à la réception des résultats des sous-arbres
+        self.stats = SearchStats(profile)
+        if progress_callback is not None:
+            self.stats.add_hook(progress_callback, progress_interval)
+
+    def add_hook(self, callback, every=1000):
+        """Enregistre callback(stats), appelé tous les 'every' nœuds développés."""
+        self.stats.add_hook(callback, every)
+
+    def _split(self, start, start_blank, start_h, bound, task_count):
+        """
+        Développe l'arbre de l'itération 'bound' en largeur depuis la racine jusqu'à 'task_count'
+        nœuds au moins. Renvoie (nœuds de la frontière, plus petit f dépassé, chemin ou None, nœuds
+        développés, nœuds générés) ; chaque nœud est (état, case vide, case vide précédente, g, h,
+        positions de la case vide depuis la racine).
+        """
+        codec = self.codec
+        update, neighbors, tile_at, move = self.heuristic.update, codec.neighbors, codec.tile_at, codec.move
+        frontier = [(start, start_blank, -1, 0, start_h, [])]
+        minimum = float('inf')
+        expanded = generated = 0
+        while frontier and len(frontier) < task_count:
+            next_frontier = []
+            for state, blank, prev_blank, g, h, prefix in frontier:
+                if h == 0:
+                    return [], minimum, prefix, expanded, generated
+                expanded += 1
+                for neighbor in neighbors[blank]:
+                    if neighbor == prev_blank:
+                        continue
+                    new_h = update(state, h, tile_at(state, neighbor), neighbor, blank)
+                    generated += 1
+                    if g + 1 + new_h > bound:
+                        minimum = min(minimum, g + 1 + new_h)
+                    else:
+                        next_frontier.append((move(state, blank, neighbor), neighbor, blank, g + 1, new_h,
+                                              prefix + [neighbor]))
+            frontier = next_frontier
+        return frontier, minimum, None, expanded, generated
+
+    def solve(self):
+        """
+        Exécute IDA* en parallèle et renvoie le chemin le plus court (MoveSequence), ou None si la
+        configuration n'est pas résoluble.
+        """
+        if not self.puzzle.is_solvable():
+            return None
+
+        codec = self.codec
+        start = codec.pack(self.puzzle.state)
+        start_blank = codec.blank_index(start)
+        start_h = self.heuristic(start)
+        stats = self.stats
+        stats.reset()
+        path = table_solution(self.puzzle, stats) if self.use_table else None
+        if path is not None:
+            return path
+        workers = self.workers if not multiprocessing.current_process().daemon else 1
+        stop_event = multiprocessing.Event()
+        if workers > 1:
+            pool = multiprocessing.Pool(workers, _init_worker,
+                                        (self.gw, self.gh, self.heuristic_name, stop_event, self.subtree_nodes))
+            replies = queue.Queue()  # Résultats (ou exceptions) des sous-arbres, dans l'ordre d'arrivée
+
+            def submit(task):
+                pool.apply_async(_run_subtree, (task,), callback=replies.put, error_callback=replies.put)
+
+            next_reply = replies.get
+        else:
+            # Même découpage, exécuté dans le processus courant (sans redécoupage, inutile ici)
+            pool = None
+            subtree_search = _SubtreeSearch(self.gw, self.gh, self.heuristic_name, stop_event, float('inf'))
+            waiting = collections.deque()
+            submit = waiting.append
+
+            def next_reply():
+                return subtree_search(waiting.popleft())
+
+        expanded = generated = 0
+        next_hook = stats.next_hook()
+        bound = start_h
+        try:
+            while True:
+                iteration_start = expanded
+                nodes, minimum, path, split_expanded, split_generated = self._split(
+                    start, start_blank, start_h, bound, workers * TASKS_PER_WORKER)
+                expanded += split_expanded
+                generated += split_generated
+                stop_event.clear()
+                prefixes = []  # Positions de la case vide de la racine à chaque sous-arbre, par identifiant
+                for state, blank, prev_blank, g, h, prefix in nodes:
+                    submit((len(prefixes), state, blank, prev_blank, g, h, bound))
+                    prefixes.append(prefix)
+                pending = len(prefixes)
+                while pending:
+                    reply = next_reply()
+                    pending -= 1
+                    if isinstance(reply, BaseException):
+                        raise reply
+                    task_id, result, suffix, task_expanded, task_generated, donated = reply
+                    expanded += task_expanded
+                    generated += task_generated
+                    if result is True:
+                        path = prefixes[task_id] + suffix
+                        stop_event.set()  # Solution optimale : les autres sous-arbres s'arrêtent
+                        break
+                    if result is not None and result < minimum:
+                        minimum = result
+                    # Branches rendues par un sous-arbre trop gros : nouveaux sous-arbres
+                    for moves, state, blank, prev_blank, g, h in donated:
+                        submit((len(prefixes), state, blank, prev_blank, g, h, bound))
+                        prefixes.append(prefixes[task_id] + moves)
+                        pending += 1
+                    if expanded >= next_hook:
+                        stats.record(expanded, generated, 0, 0, 0, 0, generated + 1, bound)
+                        next_hook = stats.fire(expanded)
+                stats.f_layers[bound] = expanded - iteration_start
+                stats.record(expanded, generated, 0, 0, 0, 0, generated + 1, bound)
+                if path is not None:
+                    return MoveSequence.from_blanks(self.gw, start_blank, path)
+                if minimum == float('inf'):
+                    return None  # Aucun état sous le seuil : pas de solution
+                bound = minimum  # Augmente le seuil au plus petit f dépassé
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
@@ -0,0 +1,217 @@
+import mmap
+import os
+import pathlib
+import struct
+import sys
+import tempfile
+
+# --- Format binaire ---
+# En-tête : MAGIC, puis (gw, gh, nombre de groupes) en octets non signés.
+# Pour chaque groupe : k (taille), les k valeurs de tuiles, puis n**k octets de table.
+MAGIC = b"PDB1"
+UNREACHED = 0xFF  # Valeur des entrées jamais atteintes (positions impossibles)
+
+# Répertoire par défaut des bases de motifs (créé à la première construction)
+PDB_DIR = pathlib.Path(__file__).resolve().parent / "pdb"
+
+
+def default_partition(gw, gh):
+    """
+    Découpe les tuiles (hors case vide) en groupes disjoints contigus (ordre de lecture).
+    4x4 : 6-6-3 ; sinon des groupes équilibrés d'au plus 4 tuiles (9 cases ou moins) ou 5.
+    """
+    tile_count = gw * gh - 1  # La case vide n'appartient à aucun groupe
+    if (gw, gh) == (4, 4):
+        sizes = [6, 6, 3]
+    else:
+        max_size = 4 if tile_count <= 8 else 5
+        group_count = -(-tile_count // max_size)  # Division arrondie au supérieur
+        sizes = [tile_count // group_count + (i < tile_count % group_count) for i in range(group_count)]
+
+    partition = []
+    start = 0
+    for size in sizes:
+        partition.append(tuple(range(start, start + size)))
+        start += size
+    return partition
+
+
+def default_path(gw, gh, partition):
+    """Chemin du fichier de base de motifs pour une grille et un découpage donnés."""
+    sizes = "-".join(str(len(group)) for group in partition)
+    return PDB_DIR / f"pdb_{gw}x{gh}_{sizes}.bin"
+
+
+def _neighbors(gw, gh):
+    """Liste des positions voisines de chaque case de la grille."""
+    neighbors = []
+    for pos in range(gw * gh):
+        x, y = pos % gw, pos // gw
+        neighbors.append([
+            (y + dy) * gw + (x + dx)
+            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]
+            if 0 <= x + dx < gw and 0 <= y + dy < gh
+        ])
+    return neighbors
+
+
+def build_pattern_table(gw, gh, tiles):
+    """
+    Construit la table d'un groupe de tuiles par parcours en largeur à rebours depuis l'état résolu.
+    Seuls les mouvements des tuiles du groupe sont comptés (les autres tuiles sont
+    indistinguables de la case vide), ce qui rend les groupes disjoints additifs.
+
+    L'index d'une configuration est sum(position_i * n**i) : un octet par entrée,
+    et un mouvement de tuile met à jour l'index en O(1) pendant la recherche.
+    """
+    n = gw * gh
+    k = len(tiles)
+    neighbors = _neighbors(gw, gh)
+    weights = [n ** i for i in range(k)]
+    table = bytearray([UNREACHED]) * (n ** k)
+    # Un bit par couple (configuration, région de la case vide)
+    visited = bytearray((n ** k * n + 7) // 8)
+
+    def region_of(start, occupied):
+        """Cases libres atteignables par la case vide sans déplacer de tuile du groupe (coût nul)."""
+        region = [start]
+        seen = {start}
+        for cell in region:
+            for nb in neighbors[cell]:
+                if nb not in seen and nb not in occupied:
+                    seen.add(nb)
+                    region.append(nb)
+        return region
+
+    def mark(code):
+        """Marque le couple (index * n + case de la région) comme visité ; False s'il l'était déjà."""
+        byte, bit = code >> 3, 1 << (code & 7)
+        if visited[byte] & bit:
+            return False
+        visited[byte] |= bit
+        return True
+
+    # État résolu : la tuile v est en position v, la case vide en dernière position
+    start_index = sum(tile * weights[i] for i, tile in enumerate(tiles))
+    start_code = start_index * n + min(region_of(n - 1, set(tiles)))
+    mark(start_code)
+    # La frontière ne stocke que des entiers (index * n + plus petite case de la région)
+    frontier = [start_code]
+    depth = 0
+
+    while frontier:
+        next_frontier = []
+        for code in frontier:
+            index, region_min = divmod(code, n)
+            if table[index] > depth:
+                table[index] = min(depth, UNREACHED - 1)
+
+            # Décode les positions des tuiles du groupe depuis l'index
+            positions = [(index // weights[i]) % n for i in range(k)]
+            occupied = set(positions)
+            region = region_of(region_min, occupied)
+            for cell in region:
+                for nb in neighbors[cell]:
+                    if nb not in occupied:
+                        continue
+                    # La tuile du groupe en 'nb' glisse dans la case libre 'cell' (coût 1)
+                    i = positions.index(nb)
+                    new_index = index + (cell - nb) * weights[i]
+                    new_occupied = occupied - {nb}
+                    new_occupied.add(cell)
+                    new_code = new_index * n + min(region_of(nb, new_occupied))
+                    if mark(new_code):
+                        next_frontier.append(new_code)
+        frontier = next_frontier
+        depth += 1
+
+    return table
+
+
+def build_pattern_database(gw, gh, partition=None, path=None, verbose=False):
+    """Construit toutes les tables d'un découpage et les enregistre dans un fichier binaire."""
+    if partition is None:
+        partition = default_partition(gw, gh)
+    if path is None:
+        path = default_path(gw, gh, partition)
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Écrit dans un fichier temporaire au nom unique puis renomme : jamais de fichier partiel, et
+    # deux constructions simultanées de la même base ne peuvent pas mélanger leurs écritures
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+        tmp_path = f.name
+        try:
+            f.write(MAGIC + struct.pack("BBB", gw, gh, len(partition)))
+            for tiles in partition:
+                if verbose:
+                    print(f"Construction du groupe {tiles}...")
+                f.write(struct.pack("B", len(tiles)) + bytes(tiles))
+                f.write(build_pattern_table(gw, gh, tiles))
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, path)
+    return path
+
+
+class PatternDatabase:
+    """
+    Base de motifs additive disjointe chargée par mmap (lecture seule).
+    Les pages sont partagées entre processus et le chargement ne lit que l'en-tête.
+    """
+
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mm[:4] != MAGIC:
+            raise ValueError(f"Fichier de base de motifs invalide : '{self.path}'")
+        self.gw, self.gh, group_count = struct.unpack_from("BBB", self._mm, 4)
+        n = self.gw * self.gh
+
+        self.partition = []  # Tuiles de chaque groupe
+        self.offsets = []  # Décalage de la table de chaque groupe dans le fichier
+        offset = 7
+        for _ in range(group_count):
+            k = self._mm[offset]
+            self.partition.append(tuple(self._mm[offset + 1:offset + 1 + k]))
+            offset += 1 + k
+            self.offsets.append(offset)
+            offset += n ** k
+
+    def lookup(self, group, index):
+        """Renvoie le coût minimal du groupe 'group' pour la configuration 'index'."""
+        return self._mm[self.offsets[group] + index]
+
+    def close(self):
+        self._mm.close()
+
+
+def load_pattern_database(gw, gh, partition=None, path=None, build=True):
+    """
+    Charge (par mmap) la base de motifs d'une grille ; la construit d'abord si elle
+    n'existe pas encore et que 'build' est vrai.
+    """
+    if partition is None:
+        partition = default_partition(gw, gh)
+    if path is None:
+        path = default_path(gw, gh, partition)
+    path = pathlib.Path(path)
+    if not path.exists():
+        if not build:
+            raise FileNotFoundError(f"Base de motifs introuvable : '{path}' "
+                                    f"(à construire au préalable : python pattern_db.py {gw} {gh})")
+        build_pattern_database(gw, gh, partition, path)
+    return PatternDatabase(path)
+
+
+if __name__ == "__main__":
+    # Utilisation : python pattern_db.py LARGEUR HAUTEUR
+    if len(sys.argv) != 3:
+        print("Utilisation : python pattern_db.py LARGEUR HAUTEUR")
+        sys.exit(1)
+    width, height = int(sys.argv[1]), int(sys.argv[2])
+    print(f"Base de motifs écrite dans '{build_pattern_database(width, height, verbose=True)}'.")
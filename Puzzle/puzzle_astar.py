@@ -1,4 +1,13 @@
-import heapq
+from bucket_queue import BucketQueue
+from distance_table import table_solution
+from heuristics import make_heuristic
+from move_sequence import MoveSequence
+from packed_state import StateCodec
+from search_stats import SearchStats
+
+
+class SearchCancelled(Exception):
+    """Levée (typiquement par le rappel de progression) pour interrompre une recherche en cours."""
 
 
 class AStarSolver:
@@ -8,111 +17,266 @@ class AStarSolver:
     entre l'état initial et l'état résolu du puzzle N-Puzzle.
     """
 
-    def __init__(self, puzzle_instance):
+    def __init__(self, puzzle_instance, heuristic="manhattan", progress_callback=None, progress_interval=1000,
+                 profile=False, use_table=True):
         # Stocke l'instance du puzzle pour accéder à son état et à ses propriétés
         self.puzzle = puzzle_instance
         # Récupère la largeur (gw) et la hauteur (gh) de la grille
         self.gw, self.gh = puzzle_instance.gs
+        # Utilise la table de distances exactes de la grille si elle a été construite (voir distance_table.py)
+        self.use_table = use_table
+        # Les états sont manipulés sous forme d'entiers compacts (voir packed_state.py)
+        self.codec = StateCodec(self.gw, self.gh)
+        # Heuristique h(n) : 'manhattan', 'linear_conflict' ou 'pdb' (voir heuristics.py)
+        self.heuristic = make_heuristic(heuristic, self.codec)
+        # Compteurs de la dernière recherche et rappels périodiques (voir search_stats.py)
+        self.stats = SearchStats(profile)
+        if progress_callback is not None:
+            # progress_callback(stats) est appelé tous les progress_interval développements ;
+            # il peut lever SearchCancelled pour interrompre la recherche.
+            self.stats.add_hook(progress_callback, progress_interval)
+
+    def add_hook(self, callback, every=1000):
+        """Enregistre callback(stats), appelé tous les 'every' nœuds développés."""
+        self.stats.add_hook(callback, every)
 
     def _heuristic(self, state):
         """
-        Calcule la distance de Manhattan totale (Manhattan Distance) pour un état donné.
+        Calcule l'heuristique choisie (par défaut la distance de Manhattan) pour un état donné.
         C'est la fonction heuristique h(n) qui estime le coût du nœud actuel à l'objectif.
         """
-        distance = 0
-        # Parcourt chaque tuile dans l'état actuel (state)
-        for i, value in enumerate(state):
-            # Ignore la case vide (blank_value) pour le calcul
-            if value == self.puzzle.blank_value:
-                continue
-
-            # Calcule la position actuelle (x, y) de la tuile i
-            current_pos = (i % self.gw, i // self.gw)
-            # Calcule la position cible (résolue) de la tuile value
-            target_pos = (value % self.gw, value // self.gw)
-
-            # Ajoute la distance de Manhattan: |x_actuel - x_cible| + |y_actuel - y_cible|
-            distance += abs(current_pos[0] - target_pos[0]) + abs(current_pos[1] - target_pos[1])
-        return distance
-
-    def _get_successors(self, state):
-        """
-        Génère tous les états successeurs valides à partir d'un état (tous les mouvements possibles).
-        """
-        successors = []
-        # Trouve l'index (position) de la case vide
-        blank_idx = state.index(self.puzzle.blank_value)
-        b_x, b_y = blank_idx % self.gw, blank_idx // self.gw  # Coordonnées (x, y) de la case vide
-
-        # Itère sur les quatre mouvements possibles (Haut, Bas, Gauche, Droite)
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            n_x, n_y = b_x + dx, b_y + dy  # Coordonnées du voisin potentiel
-
-            # Vérifie si la nouvelle position est dans les limites de la grille
-            if 0 <= n_x < self.gw and 0 <= n_y < self.gh:
-                neighbor_idx = n_y * self.gw + n_x  # Calcule l'index plat du voisin
-
-                new_state = list(state)
-                # Effectue l'échange (mouvement) de la case vide avec le voisin
-                new_state[blank_idx], new_state[neighbor_idx] = new_state[neighbor_idx], new_state[blank_idx]
-
-                # Ajoute l'état résultant sous forme de tuple (pour être hachable dans les dictionnaires)
-                successors.append(tuple(new_state))
-        return successors
+        return self.heuristic(state)
 
     def solve(self):
         """
         Exécute l'algorithme A* pour trouver le chemin le plus court.
         A* utilise f(n) = g(n) + h(n), où g(n) est le coût réel (nombre de mouvements)
         et h(n) est le coût estimé (heuristique de Manhattan).
+        Renvoie None si la configuration n'est pas résoluble.
         """
-        start_node = tuple(self.puzzle.state)
-        target_node = tuple(self.puzzle.solved_state)
+        # Les rangs de la table de distances ne distinguent pas les états insolubles : test préalable
+        if not self.puzzle.is_solvable():
+            return None
+
+        codec = self.codec
+        # Conversion vers la représentation compacte uniquement au départ de la recherche
+        start_node = codec.pack(self.puzzle.state)
+        start_blank = codec.blank_index(start_node)
+        target_node = codec.solved
+        stats = self.stats
+        stats.reset()
+
+        # Petites grilles : solution optimale lue dans la table de distances, par descente gloutonne
+        path = table_solution(self.puzzle, stats) if self.use_table else None
+        if path is not None:
+            return path
+
+        heuristic = stats.timed(self.heuristic)  # Chronométrée seulement en mode profilage
+        update = heuristic.update
 
         # g_score[n] contient le coût réel (nombre de mouvements) du départ à n
         g_score = {start_node: 0}
 
         # Calcule f_score initial: g(start) + h(start) = 0 + h(start)
-        f_score_initial = self._heuristic(start_node)
+        h_initial = heuristic(start_node)
 
-        # open_set est une min-heap stockant les tuples (f_score, state)
-        open_set = [(f_score_initial, start_node)]
-        heapq.heapify(open_set)  # Assure que open_set est une pile prioritaire
+        # open_set est une file à seaux indexée par (f, g) stockant les tuples (state, case vide, h).
+        # À f égal, les nœuds les plus profonds (plus grand g) sont développés en premier.
+        open_set = BucketQueue()
+        open_set.push(h_initial, 0, (start_node, start_blank, h_initial))
 
-        # came_from[n] est le nœud qui précède n sur le chemin le plus court trouvé jusqu'à présent
+        # came_from[n] est le nœud qui précède n sur le chemin le plus court trouvé jusqu'à présent.
+        # Pas d'ensemble fermé : un nœud déjà développé est rouvert si un chemin plus court y mène.
+        # Cela n'arrive jamais avec une heuristique cohérente (Manhattan, conflits linéaires), mais
+        # la base de motifs n'est qu'admissible (minimum sur les régions de la case vide) : sans
+        # réouverture, A* pourrait renvoyer un chemin trop long.
         came_from = {}
 
+        # Compteurs locaux (recopiés dans self.stats aux rappels et en fin de recherche)
+        expanded = generated = duplicates = stale_pops = 0
+        open_peak = 1
+        layer_f, layer_start = h_initial, 0  # Couche de f en cours et nœuds développés à son début
+        next_hook = stats.next_hook()
+
         while open_set:
             # Récupère et supprime le nœud avec le plus petit f_score
-            _, current = heapq.heappop(open_set)
+            f, g, (current, blank_idx, h) = open_set.pop()
+
+            # Suppression paresseuse : ignore les entrées périmées (g amélioré depuis)
+            if g != g_score[current]:
+                stale_pops += 1
+                continue
+            expanded += 1
+
+            # Changement de couche de f : mémorise le nombre de nœuds développés dans la précédente
+            if f != layer_f:
+                stats.f_layers[layer_f] = expanded - 1 - layer_start
+                layer_f, layer_start = f, expanded - 1
+
+            # Taille de la liste ouverte = entrées ajoutées - entrées retirées
+            open_size = generated - duplicates + 1 - expanded - stale_pops
+            if open_size > open_peak:
+                open_peak = open_size
+
+            if expanded >= next_hook:
+                stats.record(expanded, generated, duplicates, stale_pops, open_peak, len(g_score),
+                             generated - duplicates + 1, f)
+                next_hook = stats.fire(expanded)
 
             if current == target_node:
+                stats.f_layers[layer_f] = expanded - layer_start
+                stats.record(expanded, generated, duplicates, stale_pops, open_peak, len(g_score),
+                             generated - duplicates + 1, f)
                 # Si le nœud cible est atteint, reconstruit le chemin
                 path = []
                 temp = current
                 while temp in came_from:
                     path.append(temp)  # Ajoute le nœud au chemin
                     temp = came_from[temp]  # Remonte au nœud précédent
-                # Renvoie le chemin inversé (du départ à l'arrivée)
-                return path[::-1]
+                # Renvoie le chemin inversé (du départ à l'arrivée), sous forme de déplacements de la case vide
+                return MoveSequence.from_blanks(self.gw, start_blank,
+                                                [codec.blank_index(node) for node in reversed(path)])
+
+            # Calcule le coût réel du départ aux voisins via le nœud actuel
+            tentative_g_score = g + 1
 
             # Explore les voisins
-            for neighbor in self._get_successors(current):
-                # Calcule le coût réel du départ au voisin via le nœud actuel
-                tentative_g_score = g_score[current] + 1
+            for neighbor_idx in codec.neighbors[blank_idx]:
+                tile = codec.tile_at(current, neighbor_idx)
+                neighbor = codec.move(current, blank_idx, neighbor_idx)
+                generated += 1
 
-                # Si un chemin plus court est trouvé (ou si c'est la première visite)
-                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                    # Met à jour le g_score et enregistre le chemin
+                # Doublon : nœud déjà atteint avec un coût au moins aussi bon
+                if neighbor in g_score and tentative_g_score >= g_score[neighbor]:
+                    duplicates += 1
+                else:
+                    # Un chemin plus court est trouvé (ou c'est la première visite) : met à jour le g_score et enregistre le chemin
                     g_score[neighbor] = tentative_g_score
 
-                    # Calcule le nouveau f_score
-                    f_score = tentative_g_score + self._heuristic(neighbor)
+                    # Calcule le nouveau f_score (h mis à jour à partir de celui du parent)
+                    neighbor_h = update(current, h, tile, neighbor_idx, blank_idx)
+                    f_score = tentative_g_score + neighbor_h
 
                     # Enregistre le chemin optimal trouvé jusqu'à ce voisin
                     came_from[neighbor] = current
 
-                    # Ajoute ou met à jour le voisin dans la pile de priorité open_set
-                    heapq.heappush(open_set, (f_score, neighbor))
+                    # Ajoute ou met à jour le voisin dans la file de priorité open_set
+                    open_set.push(f_score, tentative_g_score, (neighbor, neighbor_idx, neighbor_h))
+
+        stats.f_layers[layer_f] = expanded - layer_start
+        stats.record(expanded, generated, duplicates, stale_pops, open_peak, len(g_score),
+                     generated - duplicates + 1, layer_f)
+        return None  # Retourne None si la file est vide (pas de solution trouvée)
+
+
+class IDAStarSolver:
+    """
+    Solveur IDA* (Iterative Deepening A*) avec la même interface que AStarSolver.
+    Au lieu de mémoriser tous les états générés, il effectue une suite de recherches
+    en profondeur bornées par un seuil f = g + h croissant. La mémoire utilisée est
+    donc linéaire en la profondeur de la solution, ce qui permet de résoudre
+    optimalement des grilles 4x4 mélangées aléatoirement sans épuiser la RAM.
+    """
+
+    def __init__(self, puzzle_instance, heuristic="manhattan", progress_callback=None, progress_interval=1000,
+                 profile=False, use_table=True):
+        # Stocke l'instance du puzzle pour accéder à son état et à ses propriétés
+        self.puzzle = puzzle_instance
+        # Récupère la largeur (gw) et la hauteur (gh) de la grille
+        self.gw, self.gh = puzzle_instance.gs
+        self.use_table = use_table  # Table de distances exactes (voir AStarSolver)
+        # Les états sont manipulés sous forme d'entiers compacts (voir packed_state.py)
+        self.codec = StateCodec(self.gw, self.gh)
+        # Heuristique mise à jour à chaque mouvement plutôt que recalculée (voir heuristics.py)
+        self.heuristic = make_heuristic(heuristic, self.codec)
+        # Compteurs et rappels (voir AStarSolver) ; f_bound est ici le seuil de l'itération,
+        # et f_layers compte les nœuds développés par itération.
+        self.stats = SearchStats(profile)
+        if progress_callback is not None:
+            self.stats.add_hook(progress_callback, progress_interval)
+
+    def add_hook(self, callback, every=1000):
+        """Enregistre callback(stats), appelé tous les 'every' nœuds développés."""
+        self.stats.add_hook(callback, every)
+
+    def _heuristic(self, state):
+        """Évaluation complète de l'heuristique (utilisée uniquement pour la racine)."""
+        return self.heuristic(state)
+
+    def solve(self):
+        """
+        Exécute IDA* et renvoie le chemin le plus court (MoveSequence, déplacements de la case vide),
+        ou None si la configuration n'est pas résoluble.
+        """
+        if not self.puzzle.is_solvable():
+            return None
+
+        codec = self.codec
+        start_node = codec.pack(self.puzzle.state)
+        start_blank = codec.blank_index(start_node)
+        stats = self.stats
+        stats.reset()
+        path = table_solution(self.puzzle, stats) if self.use_table else None
+        if path is not None:
+            return path
+        heuristic = stats.timed(self.heuristic)  # Chronométrée seulement en mode profilage
+        update = heuristic.update
+        neighbors = codec.neighbors
+        tile_at, move = codec.tile_at, codec.move
+        moves = []  # Pile des positions successives de la case vide (le chemin courant)
+        # Compteurs locaux, toutes itérations confondues (recopiés dans self.stats)
+        expanded = generated = 0
+        next_hook = stats.next_hook()
+
+        def search(state, blank, prev_blank, g, h, bound):
+            """
+            Recherche en profondeur bornée. Renvoie True si l'objectif est atteint,
+            sinon le plus petit f ayant dépassé le seuil (prochain seuil candidat).
+            """
+            f = g + h
+            if f > bound:
+                return f
+            if h == 0:
+                return True
+
+            nonlocal expanded, generated, next_hook
+            expanded += 1
+            if expanded >= next_hook:
+                stats.record(expanded, generated, 0, 0, 0, 0, generated + 1, bound)
+                next_hook = stats.fire(expanded)
+
+            minimum = float('inf')
+            for neighbor in neighbors[blank]:
+                # Ignore le mouvement qui annule le précédent (retour au parent)
+                if neighbor == prev_blank:
+                    continue
+
+                # Mise à jour incrémentale : seule la tuile déplacée change de contribution
+                new_h = update(state, h, tile_at(state, neighbor), neighbor, blank)
+                generated += 1
+
+                # Les états étant des entiers immuables, aucun retour arrière n'est nécessaire
+                moves.append(neighbor)
+                result = search(move(state, blank, neighbor), neighbor, blank, g + 1, new_h, bound)
+                if result is True:
+                    return True
+                if result < minimum:
+                    minimum = result
+                moves.pop()
+            return minimum
+
+        h_start = heuristic(start_node)
+        bound = h_start
+        while True:
+            iteration_start = expanded
+            result = search(start_node, start_blank, -1, 0, h_start, bound)
+            stats.f_layers[bound] = expanded - iteration_start
+            stats.record(expanded, generated, 0, 0, 0, 0, generated + 1, bound)
+            if result is True:
+                break
+            if result == float('inf'):
+                return None  # Aucun état sous le seuil : pas de solution
+            bound = result  # Augmente le seuil au plus petit f dépassé
 
-        return None  # Retourne None si la pile est vide (pas de solution trouvée)
\ No newline at end of file
+        # La solution est directement la suite des positions successives de la case vide
+        return MoveSequence.from_blanks(self.gw, start_blank, moves)
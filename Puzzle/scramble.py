@@ -0,0 +1,241 @@
+import random
+import time
+
+from heuristics import make_heuristic
+from packed_state import StateCodec
+from puzzle_astar import SearchCancelled
+
+# Bandes de difficulté, en centiles de l'heuristique sur des configurations tirées uniformément
+# (voir difficulty_band) : "easy" vise des états plus proches que presque toutes les configurations
+# aléatoires, "medium" les configurations typiques, "hard" le cinquième le plus éloigné.
+# La borne haute de "hard" est ouverte : tout état assez éloigné convient.
+DIFFICULTIES = {
+    "easy": (0.0, 0.05),
+    "medium": (0.2, 0.8),
+    "hard": (0.8, None),
+}
+REFERENCE_SAMPLES = 1000  # Configurations tirées pour estimer les centiles d'une grille
+
+_references = {}  # (grille, heuristique) -> valeurs triées de l'heuristique sur l'échantillon
+
+
+def count_inversions(values):
+    """
+    Nombre de paires (i, j), i < j, avec values[i] > values[j], en O(n log n) :
+    un arbre de Fenwick compte les valeurs déjà vues supérieures à la valeur courante.
+    Les valeurs doivent être des entiers distincts de 0 à len(values) - 1.
+    """
+    size = len(values)
+    tree = [0] * (size + 1)
+    inversions = 0
+    for seen, value in enumerate(values):
+        # Nombre de valeurs déjà vues inférieures ou égales à 'value'
+        smaller = 0
+        i = value + 1
+        while i > 0:
+            smaller += tree[i]
+            i -= i & -i
+        inversions += seen - smaller
+        i = value + 1
+        while i <= size:
+            tree[i] += 1
+            i += i & -i
+    return inversions
+
+
+def is_solvable_state(grid_size, state):
+    """
+    Règle de solvabilité du N-Puzzle (case vide = dernière valeur, en bas à droite une fois résolu) :
+    largeur impaire, le nombre d'inversions doit être pair ; largeur paire, la somme des
+    inversions et de la rangée de la case vide comptée depuis le bas doit être paire.
+    """
+    gw, gh = grid_size
+    blank_value = gw * gh - 1
+    inversions = count_inversions([value for value in state if value != blank_value])
+    if gw % 2 == 1:
+        return inversions % 2 == 0
+    blank_row_from_bottom = gh - 1 - list(state).index(blank_value) // gw
+    return (inversions + blank_row_from_bottom) % 2 == 0
+
+
+def random_solvable_state(rng, gw, gh):
+    """
+    Tire une configuration résoluble uniformément, sans rejet : une permutation uniforme est tirée,
+    puis, si elle est insoluble, ses deux premières tuiles (hors case vide) sont échangées.
+    Cet échange change la parité des inversions et associe à chaque état insoluble un état résoluble
+    distinct : la distribution obtenue reste uniforme.
+    """
+    tile_count = gw * gh
+    state = list(range(tile_count))
+    rng.shuffle(state)
+    if not is_solvable_state((gw, gh), state):
+        first, second = [i for i, value in enumerate(state) if value != tile_count - 1][:2]
+        state[first], state[second] = state[second], state[first]
+    return state
+
+
+def heuristic_percentile(grid_size, fraction, heuristic="linear_conflict"):
+    """
+    Centile 'fraction' (0 à 1) de l'heuristique sur des configurations tirées uniformément
+    (graine fixe, échantillon mémorisé). Il fixe l'échelle des bandes de difficulté.
+    """
+    key = (tuple(grid_size), heuristic)
+    if key not in _references:
+        gw, gh = grid_size
+        codec = StateCodec(gw, gh)
+        estimate = make_heuristic(heuristic, codec)
+        rng = random.Random(f"reference-{gw}x{gh}")
+        _references[key] = sorted(estimate(codec.pack(random_solvable_state(rng, gw, gh)))
+                                  for _ in range(REFERENCE_SAMPLES))
+    samples = _references[key]
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def difficulty_band(grid_size, difficulty, heuristic="linear_conflict"):
+    """
+    Bande [basse, haute) visée pour une difficulté ('haute' vaut None si la bande est ouverte).
+    Une bande qui part du centile 0 ("easy") porte sur la distance optimale : ces états sont plus
+    proches que les configurations aléatoires. Les autres portent sur l'heuristique elle-même,
+    pour sélectionner une partie de la distribution des configurations aléatoires.
+    """
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"Difficulté inconnue : '{difficulty}' (choix : {', '.join(DIFFICULTIES)})")
+    low, high = DIFFICULTIES[difficulty]
+    low = max(1, heuristic_percentile(grid_size, low, heuristic))
+    if high is not None:
+        high = max(low + 1, heuristic_percentile(grid_size, high, heuristic))
+    return low, high
+
+
+def _distance(codec, heuristic, code, limit, deadline):
+    """
+    Distance optimale de 'code' par IDA* si elle ne dépasse pas 'limit', sinon None.
+    Lève SearchCancelled une fois 'deadline' dépassée (None : pas de limite de temps).
+    """
+    update, neighbors, tile_at, move = heuristic.update, codec.neighbors, codec.tile_at, codec.move
+    expanded = 0
+
+    def search(state, blank, prev_blank, g, h, bound):
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0:
+            return True
+        nonlocal expanded
+        expanded += 1
+        if deadline is not None and expanded & 1023 == 0 and time.perf_counter() > deadline:
+            raise SearchCancelled()
+        minimum = float('inf')
+        for neighbor in neighbors[blank]:
+            if neighbor == prev_blank:
+                continue
+            result = search(move(state, blank, neighbor), neighbor, blank, g + 1,
+                            update(state, h, tile_at(state, neighbor), neighbor, blank), bound)
+            if result is True:
+                return True
+            if result < minimum:
+                minimum = result
+        return minimum
+
+    blank = codec.blank_index(code)
+    bound = h = heuristic(code)
+    while bound <= limit:
+        result = search(code, blank, -1, 0, h, bound)
+        if result is True:
+            return bound
+        bound = result
+    return None
+
+
+def _walk(rng, codec, length):
+    """
+    Marche aléatoire sans boucle depuis l'état résolu, jusqu'à un chemin de 'length' mouvements :
+    revenir sur un état du chemin l'y tronque. La longueur du chemin est une borne supérieure de la
+    distance optimale, plus proche de celle-ci que pour une marche quelconque de même longueur.
+    """
+    path = [codec.solved]
+    blanks = [codec.blank_index(codec.solved)]
+    index = {codec.solved: 0}
+    while len(path) <= length:
+        blank = blanks[-1]
+        previous = blanks[-2] if len(blanks) > 1 else -1
+        pos = rng.choice([pos for pos in codec.neighbors[blank] if pos != previous])
+        code = codec.move(path[-1], blank, pos)
+        if code in index:
+            for removed in path[index[code] + 1:]:
+                del index[removed]
+            del path[index[code] + 1:], blanks[index[code] + 1:]
+        else:
+            index[code] = len(path)
+            path.append(code)
+            blanks.append(pos)
+    return path[-1]
+
+
+def scramble(rng, grid_size, difficulty, heuristic="linear_conflict", time_budget=0.3, max_attempts=1000):
+    """
+    Mélange résoluble dans la bande de 'difficulty' (voir DIFFICULTIES et difficulty_band).
+    Renvoie (état, borne inférieure, borne supérieure ou None, dans la bande), les bornes portant
+    sur la distance optimale.
+
+    La bande "easy" (distance optimale) est atteinte par une marche aléatoire sans boucle depuis
+    l'état résolu : sa longueur est une borne supérieure et l'heuristique une borne inférieure ; la
+    recherche exacte (IDA*, limitée à la bande) n'est lancée que si ces bornes ne suffisent pas à
+    conclure. D'un essai
+    à l'autre, la longueur de la marche est mise à l'échelle de la distance mesurée, pour viser le
+    milieu de la bande. Les autres bandes sont obtenues par tirage uniforme filtré par l'heuristique.
+    Au-delà de 'time_budget' secondes (None : pas de limite) ou de 'max_attempts' essais, le candidat
+    le plus proche de la bande est renvoyé, avec 'dans la bande' à False.
+    """
+    gw, gh = grid_size
+    codec = StateCodec(gw, gh)
+    estimate = make_heuristic(heuristic, codec)
+    low, high = difficulty_band(grid_size, difficulty, heuristic)
+    uniform = DIFFICULTIES[difficulty][0] > 0  # Bande prise dans la distribution des tirages uniformes
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    best, best_gap = None, float('inf')
+    length = low if high is None else high - 1  # Longueur de la marche aléatoire
+    target = low if high is None else (low + high - 1) / 2  # Distance visée par la marche
+
+    for _ in range(max_attempts):
+        if uniform:
+            state = random_solvable_state(rng, gw, gh)
+            lower = estimate(codec.pack(state))
+            if lower >= low and (high is None or lower < high):
+                return state, lower, None, True
+            candidate, gap = (state, lower, None, False), low - lower if lower < low else lower - high + 1
+        else:
+            code = _walk(rng, codec, length)
+            lower, upper = estimate(code), length
+            if lower >= low and upper < high:
+                return list(codec.unpack(code)), lower, upper, True
+            if upper >= low and lower < high:
+                # Les bornes ne suffisent pas : sous la borne haute, il suffit de prouver que la
+                # distance atteint 'low' ; sinon, distance exacte si elle est dans la bande
+                limit = low - 1 if upper < high else high - 1
+                try:
+                    distance = _distance(codec, estimate, code, limit, deadline)
+                except SearchCancelled:
+                    if best is None:
+                        best = (list(codec.unpack(code)), lower, upper, False)
+                    break
+                if distance is None and upper < high:
+                    return list(codec.unpack(code)), low, upper, True
+                if distance is None:
+                    lower = high
+                elif distance >= low:
+                    return list(codec.unpack(code)), distance, distance, True
+                else:
+                    lower = upper = distance
+            # Longueur proportionnelle à l'écart entre la distance visée et la distance mesurée
+            # (la borne qui situe l'état hors de la bande) : plus longue si trop facile, sinon plus courte
+            measured = upper if upper < low else lower
+            scaled = round(length * target / max(1, measured))
+            length = max(length + 1, scaled) if upper < low else max(1, min(length - 1, scaled))
+            candidate = (list(codec.unpack(code)), lower, upper, False)
+            gap = low - upper if upper < low else max(0, lower - high + 1)
+        if gap < best_gap:
+            best, best_gap = candidate, gap
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+    return best
@@ -0,0 +1,120 @@
+import time
+
+
+class SearchStats:
+    """
+    Compteurs d'une recherche et rappels périodiques (« hooks »).
+
+    Les solveurs comptent dans des variables locales et ne recopient leurs compteurs ici
+    (record) qu'au déclenchement d'un rappel et en fin de recherche : sans rappel ni profilage,
+    l'instrumentation se réduit à quelques additions d'entiers par nœud.
+    Le profilage (profile=True) mesure en plus le temps passé dans l'heuristique.
+    """
+
+    def __init__(self, profile=False):
+        self.profile = profile
+        self._hooks = []  # Liste de [intervalle, rappel, prochain déclenchement]
+        self.reset()
+
+    def reset(self):
+        """Remet les compteurs à zéro au début d'une recherche."""
+        self.nodes_generated = 0  # Successeurs produits
+        self.nodes_expanded = 0  # Nœuds développés
+        self.duplicates = 0  # Successeurs déjà connus avec un coût au moins aussi bon
+        self.stale_pops = 0  # Entrées périmées retirées de la liste ouverte sans être développées
+        self.open_peak = 0  # Taille maximale de la liste ouverte
+        self.g_score_size = 0  # Nombre d'états mémorisés (dictionnaire g_score)
+        self.heuristic_evals = 0  # Évaluations (complètes ou incrémentales) de l'heuristique
+        self.heuristic_time = 0.0  # Temps passé dans l'heuristique (profilage uniquement)
+        self.f_layers = {}  # Nœuds développés par valeur de f (A*) ou par seuil (IDA*)
+        self.f_bound = 0  # f courant (A*) ou seuil de l'itération (IDA*)
+        self.spilled_states = 0  # États écrits sur disque faute de mémoire (voir external_search.py)
+        self.spilled_bytes = 0  # Octets correspondants
+        self.spill_files = 0  # Nombre de fichiers de débordement écrits
+        self.source = "search"  # Origine du résultat : "search", ou "table" (voir distance_table.py)
+        self.start_time = time.perf_counter()
+        self.elapsed = 0.0
+        for hook in self._hooks:
+            hook[2] = hook[0]
+
+    def record(self, expanded, generated, duplicates, stale_pops, open_peak, g_score_size, heuristic_evals,
+               f_bound, spilled_states=0, spilled_bytes=0, spill_files=0):
+        """Recopie les compteurs locaux d'un solveur (appelé aux rappels et en fin de recherche)."""
+        self.nodes_expanded = expanded
+        self.nodes_generated = generated
+        self.duplicates = duplicates
+        self.stale_pops = stale_pops
+        self.open_peak = open_peak
+        self.g_score_size = g_score_size
+        self.heuristic_evals = heuristic_evals
+        self.f_bound = f_bound
+        self.spilled_states = spilled_states
+        self.spilled_bytes = spilled_bytes
+        self.spill_files = spill_files
+        self.elapsed = time.perf_counter() - self.start_time
+
+    def add_hook(self, callback, every=1000):
+        """
+        Enregistre callback(stats), appelé tous les 'every' nœuds développés.
+        Le rappel peut lever SearchCancelled pour interrompre la recherche.
+        """
+        self._hooks.append([every, callback, every])
+
+    def next_hook(self):
+        """Nombre de nœuds développés au prochain déclenchement (infini sans rappel)."""
+        return min((hook[2] for hook in self._hooks), default=float("inf"))
+
+    def fire(self, expanded):
+        """Appelle les rappels arrivés à échéance et renvoie le prochain déclenchement."""
+        for hook in self._hooks:
+            if hook[2] <= expanded:
+                hook[2] += hook[0]
+                hook[1](self)
+        return self.next_hook()
+
+    def timed(self, heuristic):
+        """Renvoie l'heuristique telle quelle, ou enveloppée pour mesurer son temps si profile=True."""
+        return _TimedHeuristic(heuristic, self) if self.profile else heuristic
+
+    def nodes_per_sec(self):
+        return self.nodes_expanded / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self):
+        """Instantané des compteurs, sérialisable en JSON (banc d'essai, affichage de progression)."""
+        return {
+            "nodes_generated": self.nodes_generated,
+            "nodes_expanded": self.nodes_expanded,
+            "duplicates": self.duplicates,
+            "stale_pops": self.stale_pops,
+            "open_peak": self.open_peak,
+            "g_score_size": self.g_score_size,
+            "heuristic_evals": self.heuristic_evals,
+            "heuristic_time": round(self.heuristic_time, 6),
+            "f_layers": {str(f): count for f, count in sorted(self.f_layers.items())},
+            "f_bound": self.f_bound,
+            "spilled_states": self.spilled_states,
+            "spilled_bytes": self.spilled_bytes,
+            "spill_files": self.spill_files,
+            "source": self.source,
+            "elapsed": round(self.elapsed, 6),
+        }
+
+
+class _TimedHeuristic:
+    """Heuristique enveloppée qui cumule son temps d'exécution dans les statistiques."""
+
+    def __init__(self, heuristic, stats):
+        self.heuristic = heuristic
+        self.stats = stats
+
+    def __call__(self, state):
+        start = time.perf_counter()
+        h = self.heuristic(state)
+        self.stats.heuristic_time += time.perf_counter() - start
+        return h
+
+    def update(self, state, h, tile, src, dst):
+        start = time.perf_counter()
+        h = self.heuristic.update(state, h, tile, src, dst)
+        self.stats.heuristic_time += time.perf_counter() - start
+        return h
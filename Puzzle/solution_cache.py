@@ -0,0 +1,203 @@
+import pathlib
+import sqlite3
+import time
+from collections import OrderedDict
+
+from move_sequence import MoveSequence
+from packed_state import StateCodec
+
+CACHE_PATH = pathlib.Path(__file__).resolve().parent / "cache" / "solutions.db"
+
+_SCHEMA_VERSION = 2  # Version 2 : solutions au format MoveSequence (2 bits par mouvement)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS paths (
+    id INTEGER PRIMARY KEY,
+    gw INTEGER NOT NULL,
+    gh INTEGER NOT NULL,
+    start TEXT NOT NULL,
+    moves BLOB NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS states (
+    gw INTEGER NOT NULL,
+    gh INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    path_id INTEGER NOT NULL,
+    PRIMARY KEY (gw, gh, state)
+);
+CREATE INDEX IF NOT EXISTS states_path ON states (path_id);
+CREATE INDEX IF NOT EXISTS paths_last_used ON paths (last_used);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) SELECT 'states', COUNT(*) FROM states;
+"""
+
+
+class SolutionCache:
+    """
+    Cache des solutions optimales, indexé par (gw, gh, état compacté).
+
+    Chaque solution est mémorisée sous forme compacte (MoveSequence) et tous ses états
+    intermédiaires sont indexés : un suffixe d'un chemin optimal est lui-même optimal, donc tout
+    état rencontré le long d'une solution connue (rejeu, démonstration, reprise en cours
+    d'animation) est résolu sans recherche.
+    La mémoire est gérée en LRU, limitée à 'max_states' états mémorisés. Avec 'path', les
+    solutions sont aussi conservées dans une base SQLite sur disque (limitée à 'max_disk_states'
+    états, les moins récemment utilisées étant évincées en premier). Le nombre d'états de la base
+    est tenu à jour dans la table meta, dans la même transaction que chaque écriture : il reste
+    exact quand plusieurs processus partagent la base, sans la recompter à chaque ajout.
+    """
+
+    def __init__(self, max_states=200_000, path=None, max_disk_states=2_000_000):
+        self.max_states = max_states
+        self.max_disk_states = max_disk_states
+        self._codecs = {}
+        # Chemins complets (clé : grille et code de l'état de départ), du moins au plus récemment utilisé
+        self._paths = OrderedDict()
+        self._index = {}  # (gw, gh, code) -> (clé du chemin qui contient cet état, rang de l'état)
+        self._size = 0  # Nombre total d'états mémorisés
+        self.hits = self.misses = 0
+
+        self._db = None
+        if path is not None:
+            path = pathlib.Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), timeout=30)
+            if self._db.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                # Base d'un ancien format : elle est recréée
+                self._db.executescript("DROP TABLE IF EXISTS paths; DROP TABLE IF EXISTS states;")
+                self._db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self._db.executescript(_SCHEMA)
+
+    def _codec(self, gw, gh):
+        codec = self._codecs.get((gw, gh))
+        if codec is None:
+            codec = self._codecs[(gw, gh)] = StateCodec(gw, gh)
+        return codec
+
+    def lookup(self, gw, gh, state):
+        """
+        Renvoie la solution optimale de 'state' (MoveSequence, comme les solveurs) si elle est
+        connue, sinon None.
+        """
+        code = self._codec(gw, gh).pack(state)
+        entry = self._index.get((gw, gh, code))
+        if entry is None and self._db is not None:
+            entry = self._load(gw, gh, code)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        key, offset = entry
+        self._paths.move_to_end(key)
+        return self._paths[key][offset:]
+
+    def store(self, gw, gh, state, path):
+        """Mémorise une solution OPTIMALE de 'state' (MoveSequence)."""
+        codec = self._codec(gw, gh)
+        start = codec.pack(state)
+        if self._index.get((gw, gh, start)) is not None:
+            return  # Déjà connue (éventuellement comme suffixe d'une solution plus longue)
+        codes = self._remember(gw, gh, start, path)
+        if self._db is not None:
+            self._save(gw, gh, codes, path)
+
+    def _codes(self, gw, gh, start, path):
+        """Codes des états d'un chemin, état de départ compris."""
+        codec = self._codec(gw, gh)
+        blank = codec.blank_index(start)
+        codes = [start]
+        for pos in path.blanks(blank):
+            codes.append(codec.move(codes[-1], blank, pos))
+            blank = pos
+        return codes
+
+    def _remember(self, gw, gh, start, path):
+        """
+        Ajoute un chemin au cache mémoire, évince les moins récemment utilisés et renvoie les codes
+        des états indexés.
+        """
+        key = (gw, gh, start)
+        if key in self._paths:
+            self._forget(key)
+        self._paths[key] = path
+        codes = self._codes(gw, gh, start, path)
+        self._size += len(codes)
+        for offset, code in enumerate(codes):
+            self._index[(gw, gh, code)] = (key, offset)
+        while self._size > self.max_states and len(self._paths) > 1:
+            self._forget(next(iter(self._paths)))
+        return codes
+
+    def _forget(self, key):
+        """Retire un chemin du cache mémoire."""
+        gw, gh, start = key
+        codes = self._codes(gw, gh, start, self._paths.pop(key))
+        self._size -= len(codes)
+        for code in codes:
+            # Un état partagé avec un chemin plus récent reste indexé sur celui-ci
+            entry = self._index.get((gw, gh, code))
+            if entry is not None and entry[0] == key:
+                del self._index[(gw, gh, code)]
+
+    def _load(self, gw, gh, code):
+        """
+        Cherche l'état sur disque ; le chemin trouvé est copié dans le cache mémoire.
+        Renvoie (clé du chemin, rang de l'état) comme self._index, ou None.
+        """
+        row = self._db.execute(
+            "SELECT p.id, p.start, p.moves FROM states s JOIN paths p ON p.id = s.path_id "
+            "WHERE s.gw = ? AND s.gh = ? AND s.state = ?", (gw, gh, str(code))).fetchone()
+        if row is None:
+            return None
+        path_id, start, moves = row
+        with self._db:
+            self._db.execute("UPDATE paths SET last_used = ? WHERE id = ?", (time.time(), path_id))
+        self._remember(gw, gh, int(start), MoveSequence.from_bytes(gw, moves))
+        return self._index.get((gw, gh, code))
+
+    def _save(self, gw, gh, codes, path):
+        """Écrit un chemin sur disque puis évince les chemins les moins récemment utilisés."""
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT INTO paths (gw, gh, start, moves, last_used) VALUES (?, ?, ?, ?, ?)",
+                (gw, gh, str(codes[0]), path.to_bytes(), time.time()))
+            # Les états déjà connus passent au nouveau chemin ; seuls les autres s'ajoutent au compte
+            rows = [(cursor.lastrowid, gw, gh, str(code)) for code in codes]
+            self._db.executemany("UPDATE states SET path_id = ? WHERE gw = ? AND gh = ? AND state = ?", rows)
+            added = self._db.executemany(
+                "INSERT OR IGNORE INTO states (path_id, gw, gh, state) VALUES (?, ?, ?, ?)", rows).rowcount
+            size = self._db.execute("SELECT value FROM meta WHERE key = 'states'").fetchone()[0] + added
+            start_size = size - added
+            while size > self.max_disk_states:
+                oldest = self._db.execute("SELECT id FROM paths ORDER BY last_used LIMIT 1").fetchone()
+                if oldest is None or oldest[0] == cursor.lastrowid:
+                    break
+                size -= self._db.execute("DELETE FROM states WHERE path_id = ?", oldest).rowcount
+                self._db.execute("DELETE FROM paths WHERE id = ?", oldest)
+            if size != start_size:
+                self._db.execute("UPDATE meta SET value = ? WHERE key = 'states'", (size,))
+
+    def solve(self, solver):
+        """
+        Renvoie la solution du puzzle de 'solver' depuis le cache, ou la calcule avec solver.solve()
+        puis la mémorise. Seules les solutions optimales sont mémorisées (borne 1.0 pour 'anytime').
+        """
+        gw, gh = solver.puzzle.gs
+        state = solver.puzzle.state
+        path = self.lookup(gw, gh, state)
+        if path is None:
+            path = solver.solve()
+            if path is not None and getattr(solver, "bound", 1.0) <= 1.0:
+                self.store(gw, gh, state, path)
+        return path
+
+    def __len__(self):
+        return self._size
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
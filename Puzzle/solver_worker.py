@@ -0,0 +1,225 @@
+import atexit
+import multiprocessing
+import queue
+import signal
+import time
+
+from anytime_search import AnytimeSolver
+from board import Board
+from external_search import ExternalAStarSolver
+from parallel_search import ParallelIDAStarSolver
+from puzzle_astar import AStarSolver, IDAStarSolver, SearchCancelled
+
+PROCESS_JOIN_TIMEOUT = 1.0  # Attente maximale (s) de l'arrêt d'un processus de résolution terminé
+
+# Moteurs de recherche disponibles, sélectionnables par leur nom
+ENGINES = {
+    "astar": AStarSolver,
+    "idastar": IDAStarSolver,
+    "anytime": AnytimeSolver,
+    "parallel": ParallelIDAStarSolver,
+    "external": ExternalAStarSolver,
+}
+
+
+class _StateLimitReached(SearchCancelled):
+    """Levée par le rappel de progression quand la recherche dépasse son plafond d'états mémorisés."""
+
+
+def _solve_worker(grid_size, state, engine, heuristic, progress_interval, messages, cancel_event,
+                  time_budget=None, max_states=None):
+    """
+    Point d'entrée du processus de résolution : envoie progression et résultat via 'messages'.
+    Avec le moteur 'anytime', le résultat part dès que le budget de temps est écoulé ; la recherche
+    continue ensuite et envoie chaque solution améliorée ("improved"), puis "finished".
+    Au-delà de 'max_states' états mémorisés, la recherche s'arrête d'elle-même : la meilleure
+    solution connue ('anytime') ou une erreur est envoyée, puis "finished".
+    """
+    # Le processus hérite des gestionnaires de signaux de pygame, qui ignorent SIGTERM : terminate()
+    # doit toujours l'arrêter. La sortie passe par SystemExit pour que les blocs finally s'exécutent
+    # (pool du moteur 'parallel'), sans attendre l'envoi des messages que plus personne ne lit
+    def on_terminate(signum, frame):
+        messages.cancel_join_thread()
+        raise SystemExit()
+
+    signal.signal(signal.SIGTERM, on_terminate)
+    start_time = time.perf_counter()
+    deadline = None if time_budget is None else start_time + time_budget
+    sent = None  # Dernière borne envoyée (None tant que le résultat n'est pas parti)
+
+    def send_best(solver):
+        nonlocal sent
+        if sent is None:
+            messages.put(("result", solver.best_path, time.perf_counter() - start_time, solver.bound))
+        else:
+            messages.put(("improved", solver.best_path, solver.bound))
+        sent = solver.bound
+
+    def on_progress(stats):
+        # Vérifie la demande d'annulation à chaque point de progression
+        if cancel_event.is_set():
+            raise SearchCancelled()
+        messages.put(("progress", stats.as_dict()))
+        if max_states is not None and stats.g_score_size > max_states:
+            raise _StateLimitReached()
+        # Budget écoulé entre deux améliorations : envoie la meilleure solution connue
+        if sent is None and deadline is not None and solver.best_path is not None \
+                and time.perf_counter() >= deadline:
+            send_best(solver)
+
+    try:
+        solver = ENGINES[engine](Board(grid_size, state), heuristic, on_progress, progress_interval)
+        if engine == "anytime":
+            for _, bound in solver.solutions():
+                if sent is not None or bound <= 1.0 or (deadline is not None and time.perf_counter() >= deadline):
+                    send_best(solver)
+            if sent is None:
+                messages.put(("result", solver.best_path, time.perf_counter() - start_time, solver.bound))
+        else:
+            path = solver.solve()
+            messages.put(("result", path, time.perf_counter() - start_time, 1.0))
+    except _StateLimitReached:
+        # Plafond de mémoire atteint : la meilleure solution connue reste utilisable, non prouvée
+        if engine != "anytime":
+            messages.put(("error", f"plafond de {max_states} états mémorisés atteint"))
+        elif sent is None:
+            messages.put(("result", solver.best_path, time.perf_counter() - start_time, solver.bound))
+    except SearchCancelled:
+        return  # Annulation demandée : le processus se termine sans résultat
+    except Exception as error:
+        messages.put(("error", repr(error)))
+        return
+    messages.put(("finished",))
+
+
+class SolverTask:
+    """
+    Résolution lancée dans un processus séparé, consultable comme un « future » :
+    la boucle pygame appelle done() à chaque image (non bloquant), affiche 'progress',
+    puis récupère result() une fois la recherche terminée, ou l'interrompt avec cancel().
+    Avec le moteur 'anytime', la recherche se poursuit après result() : improvement() renvoie
+    les solutions améliorées au fil de l'eau, jusqu'à finished() ou cancel().
+    """
+
+    def __init__(self, puzzle, engine="astar", heuristic="manhattan", progress_interval=2000, time_budget=None,
+                 max_states=None):
+        self.start_time = time.perf_counter()
+        # Dernier instantané des statistiques reçu (voir SearchStats.as_dict) ou None
+        self.progress = None
+        self.search_time = None  # Durée de la recherche mesurée dans le processus
+        self.bound = None  # Borne de sous-optimalité de la dernière solution reçue (1.0 = optimale)
+
+        self._result = None
+        self._improved = None
+        self._error = None
+        self._done = False
+        self._finished = False
+        self._cancelled = False
+
+        self._messages = multiprocessing.Queue()
+        self._cancel_event = multiprocessing.Event()
+        # Un processus démon ne bloque jamais la fermeture du jeu, mais ne peut pas créer de
+        # processus : le moteur 'parallel' est lancé sans, et arrêté explicitement à la sortie
+        daemon = engine != "parallel"
+        self._process = multiprocessing.Process(
+            target=_solve_worker,
+            args=(puzzle.gs, list(puzzle.state), engine, heuristic, progress_interval,
+                  self._messages, self._cancel_event, time_budget, max_states),
+            daemon=daemon,
+        )
+        self._process.start()
+        if not daemon:
+            atexit.register(self.cancel)
+
+    def _handle(self, message):
+        """Traite un message reçu du processus de résolution."""
+        kind = message[0]
+        if kind == "progress":
+            self.progress = message[1]
+        elif kind == "result":
+            self._result, self.search_time, self.bound = message[1], message[2], message[3]
+            self._done = True
+        elif kind == "improved":
+            self._improved, self.bound = message[1], message[2]
+        elif kind == "finished":
+            self._finished = True
+        elif kind == "error":
+            self._error = message[1]
+            self._done = self._finished = True
+
+    @property
+    def process(self):
+        """Processus de résolution (multiprocessing.Process)."""
+        return self._process
+
+    def _poll(self, until_done):
+        """Lit les messages en attente sans bloquer (jusqu'au résultat si until_done)."""
+        while not self._finished and not (until_done and self._done):
+            try:
+                self._handle(self._messages.get_nowait())
+            except queue.Empty:
+                # Processus arrêté sans avoir tout envoyé (plantage, mémoire épuisée...)
+                if not self._process.is_alive() and self._messages.empty():
+                    if not self._done:
+                        self._error = f"processus de résolution arrêté (code {self._process.exitcode})"
+                    self._done = self._finished = True
+                break
+        if self._finished:
+            self._stop_process()
+
+    def _stop_process(self):
+        """
+        Arrête et attend le processus. Sans cela, un processus dont les messages ne sont plus lus
+        resterait bloqué à vider sa file (Queue) au lieu de se terminer.
+        """
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join(PROCESS_JOIN_TIMEOUT)
+        atexit.unregister(self.cancel)
+
+    def done(self):
+        """Lit les messages en attente sans bloquer ; renvoie True si le résultat est disponible."""
+        self._poll(until_done=True)
+        return self._done
+
+    def finished(self):
+        """Renvoie True une fois la recherche entièrement terminée (plus aucune amélioration à venir)."""
+        self._poll(until_done=False)
+        return self._finished
+
+    def improvement(self):
+        """Renvoie la dernière solution améliorée reçue depuis l'appel précédent, ou None."""
+        self._poll(until_done=False)
+        improved, self._improved = self._improved, None
+        return improved
+
+    def elapsed(self):
+        """Temps écoulé depuis le lancement de la recherche, en secondes."""
+        return time.perf_counter() - self.start_time
+
+    def result(self, timeout=None):
+        """
+        Attend (au plus 'timeout' secondes) et renvoie le chemin trouvé (ou None si aucune solution).
+        Lève RuntimeError si la recherche a échoué ou a été annulée, TimeoutError si elle n'est pas finie.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while not self.done():
+            if deadline is not None and time.perf_counter() >= deadline:
+                raise TimeoutError("la recherche n'est pas terminée")
+            time.sleep(0.01)
+        if self._cancelled:
+            raise RuntimeError("recherche annulée")
+        if self._error is not None:
+            raise RuntimeError(self._error)
+        return self._result
+
+    def cancel(self):
+        """Arrête la recherche : le processus est terminé, puis attendu."""
+        if not self._finished:
+            self._cancel_event.set()
+            self._cancelled = not self._done
+            self._done = self._finished = True
+        self._stop_process()
+
+    def cancelled(self):
+        return self._cancelled
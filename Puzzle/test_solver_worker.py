@@ -0,0 +1,30 @@
+import time
+import unittest
+
+from board import Board
+from solver_worker import SolverTask
+
+# Configuration 4x4 difficile (plusieurs secondes de recherche) : la tâche est encore active à l'annulation
+HARD_4X4 = [0, 12, 9, 13, 15, 11, 10, 14, 3, 7, 2, 5, 4, 8, 6, 1]
+
+
+class SolverTaskTest(unittest.TestCase):
+
+    def test_cancel_stops_process(self):
+        # Intervalle de progression court : la file de messages se remplit sans être lue
+        task = SolverTask(Board((4, 4), HARD_4X4), "idastar", "manhattan", progress_interval=10)
+        time.sleep(1.0)
+        task.cancel()
+        self.assertTrue(task.cancelled())
+        self.assertFalse(task.process.is_alive())
+
+    def test_finished_task_is_reaped(self):
+        task = SolverTask(Board((3, 3), [0, 1, 2, 3, 4, 5, 8, 6, 7]), "astar", "manhattan")
+        self.assertEqual(len(task.result(timeout=30)), 2)
+        while not task.finished():
+            time.sleep(0.01)
+        self.assertFalse(task.process.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()